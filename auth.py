@@ -1,25 +1,10 @@
 import streamlit as st
-from datetime import datetime
-import pandas as pd
-import os
 from dadosMocados import USUARIOS
+from utils.log_acessos import registrar_evento
 
 def registrar_acesso(usuario):
-    log_path = "log_acessos.xlsx"
-    novo_log = {
-        "usuario": usuario,
-        "data": datetime.now().strftime("%Y-%m-%d"),
-        "hora": datetime.now().strftime("%H:%M:%S")
-    }
-
-    
-    if os.path.exists(log_path):
-        df_existente = pd.read_excel(log_path)
-        df_atualizado = pd.concat([df_existente, pd.DataFrame([novo_log])], ignore_index=True)
-    else:
-        df_atualizado = pd.DataFrame([novo_log])
-
-    df_atualizado.to_excel(log_path, index=False)
+    # Acrescenta ao log (logs/acessos.jsonl) sem reler o histórico; o Excel é gerado sob demanda
+    registrar_evento(usuario)
 
 def login():
     st.title("🎓 Sistema Previsão de Evasão")
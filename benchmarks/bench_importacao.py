@@ -0,0 +1,56 @@
+"""
+Benchmark de importação: tempo até a tela de login e até cada painel, em processos novos.
+
+Cada medição roda em um interpretador novo (como um worker recém-iniciado do Streamlit)
+e é repetida --repeticoes vezes; a tabela mostra a mediana.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_importacao --repeticoes 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+CENARIOS = {
+    # O que o main.py importa antes de desenhar o formulário de login
+    "tela de login": "import main",
+    # Importação antecipada dos dois painéis (como o main.py fazia antes)
+    "login + todos os painéis": "import main, views.coordenador_view, views.professor_view",
+    "primeiro acesso: coordenador": "import main, views.coordenador_view",
+    "primeiro acesso: professor": "import main, views.professor_view",
+}
+
+_SCRIPT = """
+import logging, time, warnings
+warnings.filterwarnings("ignore")
+logging.disable(logging.WARNING)
+inicio = time.perf_counter()
+{codigo}
+print(time.perf_counter() - inicio)
+"""
+
+
+def medir(codigo: str, repeticoes: int) -> list:
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", _SCRIPT.format(codigo=codigo)], capture_output=True, text=True, check=True
+        )
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return tempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'cenário':<32} {'mediana (s)':>12} {'mín (s)':>9} {'máx (s)':>9}")
+    for nome, codigo in CENARIOS.items():
+        tempos = medir(codigo, args.repeticoes)
+        print(f"{nome:<32} {statistics.median(tempos):>12.2f} {min(tempos):>9.2f} {max(tempos):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark da pontuação paralela: vazão (alunos/s) de 1 até N processos.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_paralelo --linhas 200000 --max-processos 8
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from model.pontuacao_paralela import pontuar_em_paralelo, TAMANHO_PARTICAO_PADRAO
+
+BASE_AMOSTRA = "dataset/base-sintetica-turma-4-corrigido-atualizada.csv"
+
+
+def montar_coorte(linhas: int) -> pd.DataFrame:
+    # Reamostra a base de exemplo até o tamanho desejado
+    base = pd.read_csv(BASE_AMOSTRA)
+    coorte = base.sample(n=linhas, replace=True, random_state=42).reset_index(drop=True)
+    coorte["id_aluno"] = range(1, linhas + 1)
+    return coorte
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--max-processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tamanho-particao", type=int, default=TAMANHO_PARTICAO_PADRAO)
+    args = parser.parse_args(argv)
+
+    coorte = montar_coorte(args.linhas)
+    # Aquecimento: carrega os artefatos no processo principal antes de medir
+    pontuar_em_paralelo(coorte.head(10), n_processos=1)
+
+    print(f"{args.linhas} alunos, partições de {args.tamanho_particao} linhas\n")
+    print(f"{'processos':>9} {'tempo (s)':>10} {'alunos/s':>12} {'speedup':>8}")
+
+    tempo_base = None
+    for n in range(1, args.max_processos + 1):
+        inicio = time.perf_counter()
+        pontuar_em_paralelo(coorte, n_processos=n, tamanho_particao=args.tamanho_particao)
+        tempo = time.perf_counter() - inicio
+        tempo_base = tempo_base or tempo
+        print(f"{n:>9} {tempo:>10.2f} {args.linhas / tempo:>12,.0f} {tempo_base / tempo:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
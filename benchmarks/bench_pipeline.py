@@ -0,0 +1,221 @@
+"""
+Benchmark do pipeline de pontuação e relatórios em coortes sintéticas.
+
+Mede tempo, vazão (linhas/s) e pico de memória de cada etapa:
+leitura do CSV (pd.read_csv e ler_csv_alunos), etapas de prever_risco_evasao, gerar_relatorio_pdf,
+gerar_pdf_risco_alunos e registrar_acesso. Cada execução é acrescentada a
+benchmarks/resultados.jsonl e comparada com a execução anterior da mesma etapa.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_pipeline --escalas 1000 100000 1000000
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from auth import registrar_acesso
+from benchmarks.gerar_coorte import gravar_coorte_csv
+from model.engenharia_features import calcular_features_notas
+from model.ingestao_csv import ler_csv_alunos
+from model.inferencia_modelo import atribuir_resultado, preparar_colunas, prever_risco_evasao
+from model.mlp_numpy import MLPNumpy
+from model.normalizacao import aplicar_normalizacao
+from model.registro_modelo import obter_artefatos, versao_modelo
+from utils import log_acessos
+from utils.relatorios import gerar_relatorio_pdf
+from utils.relatorios_professor import gerar_pdf_risco_alunos
+
+CAMINHO_RESULTADOS = "benchmarks/resultados.jsonl"
+MAX_LINHAS_PDF = 20_000
+N_ACESSOS = 10_000
+
+
+def medir(funcao, *args, medir_memoria=True, **kwargs):
+    """
+    Devolve (resultado, segundos, pico de memória em MB).
+
+    O tempo é medido sem tracemalloc (que deixa código com muitos objetos Python, como o
+    reportlab, várias vezes mais lento); o pico vem de uma segunda execução rastreada.
+    """
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    segundos = time.perf_counter() - inicio
+    if not medir_memoria:
+        return resultado, segundos, None
+
+    del resultado
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = funcao(*args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, segundos, pico / 1024 / 1024
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ======================
+# Etapas medidas
+# ======================
+def etapas_predicao(df: pd.DataFrame):
+    """Mesma sequência de prever_risco_evasao, etapa por etapa."""
+    artefatos = obter_artefatos()
+    estado = {}
+
+    def copia():
+        estado["df"] = df.copy()
+
+    def features_notas():
+        estado["slope_std"] = calcular_features_notas(estado["df"], artefatos.grade_cols)
+
+    def preparar():
+        preparar_colunas(estado["df"], artefatos, estado["slope_std"])
+
+    def normalizacao():
+        matriz = estado["df"][artefatos.features].to_numpy(dtype=float)
+        estado["X"] = aplicar_normalizacao(matriz, artefatos.media_features, artefatos.escala_features)
+
+    def forward():
+        X = estado["X"]
+        if not isinstance(artefatos.modelo, MLPNumpy):
+            X = pd.DataFrame(X, columns=artefatos.features, index=estado["df"].index)
+        estado["prob"] = artefatos.modelo.predict_proba(X)[:, 1]
+
+    def classificacao():
+        atribuir_resultado(estado["df"], estado["prob"], artefatos)
+
+    return [
+        ("prever.copia", copia),
+        ("prever.features_notas", features_notas),
+        ("prever.preparar_colunas", preparar),
+        ("prever.normalizacao", normalizacao),
+        ("prever.forward", forward),
+        ("prever.classificacao", classificacao),
+        ("prever.total", lambda: prever_risco_evasao(df)),
+    ]
+
+
+def registrar_acessos(n: int):
+    # Grava num diretório temporário para não misturar com o log de auditoria real
+    caminho_original = log_acessos.CAMINHO_LOG
+    with tempfile.TemporaryDirectory() as pasta:
+        log_acessos.CAMINHO_LOG = os.path.join(pasta, "acessos.jsonl")
+        try:
+            for i in range(n):
+                registrar_acesso(f"usuario{i % 50}")
+            log_acessos.flush()
+        finally:
+            log_acessos.CAMINHO_LOG = caminho_original
+
+# ======================
+# Execução
+# ======================
+def executar(escalas, max_linhas_pdf=MAX_LINHAS_PDF, n_acessos=N_ACESSOS, medir_memoria=True):
+    obter_artefatos()  # carrega o modelo fora das medições
+    resultados = []
+
+    def registrar(escala, etapa, linhas, segundos, pico_mb):
+        resultados.append({
+            "escala": escala, "etapa": etapa, "linhas": linhas, "segundos": round(segundos, 4),
+            "linhas_por_s": round(linhas / segundos, 1) if segundos > 0 else None,
+            "pico_memoria_mb": round(pico_mb, 1) if pico_mb is not None else None,
+        })
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for escala in escalas:
+            caminho_csv = gravar_coorte_csv(escala, os.path.join(pasta, f"coorte_{escala}.csv"))
+
+            df, segundos, pico = medir(pd.read_csv, caminho_csv, medir_memoria=medir_memoria)
+            registrar(escala, "csv.leitura", escala, segundos, pico)
+
+            _, segundos, pico = medir(ler_csv_alunos, caminho_csv, medir_memoria=medir_memoria)
+            registrar(escala, "csv.ingestao", escala, segundos, pico)
+
+            for etapa, funcao in etapas_predicao(df):
+                _, segundos, pico = medir(funcao, medir_memoria=medir_memoria)
+                registrar(escala, etapa, escala, segundos, pico)
+
+            # PDFs muito grandes são limitados a max_linhas_pdf linhas (registradas em "linhas")
+            df_pred = prever_risco_evasao(df.head(max_linhas_pdf))
+            _, segundos, pico = medir(gerar_relatorio_pdf, df_pred, "Relatório de Risco Geral", medir_memoria=medir_memoria)
+            registrar(escala, "pdf.relatorio_geral", len(df_pred), segundos, pico)
+            _, segundos, pico = medir(gerar_pdf_risco_alunos, df_pred, medir_memoria=medir_memoria)
+            registrar(escala, "pdf.risco_alunos", len(df_pred), segundos, pico)
+
+    _, segundos, pico = medir(registrar_acessos, n_acessos, medir_memoria=medir_memoria)
+    registrar(None, "log.registrar_acesso", n_acessos, segundos, pico)
+    return resultados
+
+
+def carregar_anteriores(caminho=CAMINHO_RESULTADOS) -> dict:
+    """Último resultado gravado para cada (escala, etapa, linhas)."""
+    anteriores = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
+                execucao = json.loads(linha)
+                for r in execucao["resultados"]:
+                    anteriores[(r["escala"], r["etapa"], r["linhas"])] = r
+    return anteriores
+
+
+def salvar_resultados(resultados, caminho=CAMINHO_RESULTADOS):
+    execucao = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "versao_modelo": versao_modelo(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+        "resultados": resultados,
+    }
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+
+
+def imprimir(resultados, anteriores):
+    print(f"{'escala':>9} {'etapa':<26} {'linhas':>9} {'tempo (s)':>10} {'linhas/s':>13} {'pico (MB)':>10} {'vs. anterior':>13}")
+    for r in resultados:
+        anterior = anteriores.get((r["escala"], r["etapa"], r["linhas"]))
+        variacao = f"{(r['segundos'] / anterior['segundos'] - 1):+.0%}" if anterior and anterior["segundos"] else "-"
+        linhas_por_s = f"{r['linhas_por_s']:,.0f}" if r["linhas_por_s"] else "-"
+        pico = f"{r['pico_memoria_mb']:.1f}" if r["pico_memoria_mb"] is not None else "-"
+        print(f"{r['escala'] or '-':>9} {r['etapa']:<26} {r['linhas']:>9} {r['segundos']:>10.3f} "
+              f"{linhas_por_s:>13} {pico:>10} {variacao:>13}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--max-linhas-pdf", type=int, default=MAX_LINHAS_PDF)
+    parser.add_argument("--acessos", type=int, default=N_ACESSOS)
+    parser.add_argument("--resultados", default=CAMINHO_RESULTADOS)
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória (execução mais rápida)")
+    parser.add_argument("--nao-salvar", action="store_true", help="só imprime, sem gravar em --resultados")
+    args = parser.parse_args(argv)
+
+    resultados = executar(args.escalas, args.max_linhas_pdf, args.acessos, not args.sem_memoria)
+    imprimir(resultados, carregar_anteriores(args.resultados))
+    if not args.nao_salvar:
+        salvar_resultados(resultados, args.resultados)
+        print(f"\nResultados acrescentados a {args.resultados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark do serviço de pontuação: muitas requisições pequenas (um aluno cada) em paralelo.
+
+Compara a pontuação aluno a aluno com prever_risco_evasao, o serviço sem agrupamento
+(max_lote=1) e o serviço com micro-lotes.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_servico --requisicoes 5000 --concorrencia 64
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import pandas as pd
+
+from benchmarks.gerar_coorte import gerar_coorte
+from model.inferencia_modelo import prever_risco_evasao
+from model.servico_pontuacao import iniciar_servico, ESPERA_MAXIMA_PADRAO, MAX_LOTE_PADRAO
+
+
+async def _cliente(porta, alunos, resultados):
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    try:
+        for aluno in alunos:
+            corpo = json.dumps(aluno).encode("utf-8")
+            escritor.write(
+                b"POST /pontuar HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo
+            )
+            await escritor.drain()
+            status = int((await leitor.readline()).split()[1])
+            tamanho = 0
+            while (linha := await leitor.readline()) not in (b"\r\n", b""):
+                nome, _, valor = linha.decode("latin-1").partition(":")
+                if nome.lower() == "content-length":
+                    tamanho = int(valor)
+            resposta = json.loads(await leitor.readexactly(tamanho))
+            resultados.append((status, resposta))
+    finally:
+        escritor.close()
+
+
+async def medir_servico(alunos, concorrencia, porta, **opcoes_agrupador):
+    servidor = await iniciar_servico(porta=porta, **opcoes_agrupador)
+    resultados = []
+    async with servidor:
+        inicio = time.perf_counter()
+        fatias = [alunos[i::concorrencia] for i in range(concorrencia)]
+        await asyncio.gather(*(_cliente(porta, fatia, resultados) for fatia in fatias))
+        segundos = time.perf_counter() - inicio
+    falhas = sum(1 for status, _ in resultados if status != 200)
+    return segundos, falhas, resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=5_000)
+    parser.add_argument("--concorrencia", type=int, default=64)
+    parser.add_argument("--porta", type=int, default=8599)
+    args = parser.parse_args(argv)
+
+    coorte = gerar_coorte(args.requisicoes)
+    alunos = json.loads(coorte.to_json(orient="records"))
+
+    print(f"{args.requisicoes} requisições de um aluno, {args.concorrencia} clientes concorrentes\n")
+    print(f"{'modo':<28} {'tempo (s)':>10} {'req/s':>10} {'falhas':>7}")
+
+    prever_risco_evasao(coorte.head(1))  # aquecimento
+    inicio = time.perf_counter()
+    for i in range(len(coorte)):
+        prever_risco_evasao(coorte.iloc[i:i + 1])
+    segundos = time.perf_counter() - inicio
+    print(f"{'aluno a aluno (sem serviço)':<28} {segundos:>10.2f} {args.requisicoes / segundos:>10,.0f} {0:>7}")
+
+    for nome, max_lote in [("serviço, max_lote=1", 1), (f"serviço, max_lote={MAX_LOTE_PADRAO}", MAX_LOTE_PADRAO)]:
+        segundos, falhas, resultados = asyncio.run(medir_servico(
+            alunos, args.concorrencia, args.porta, max_lote=max_lote, espera_maxima=ESPERA_MAXIMA_PADRAO,
+        ))
+        print(f"{nome:<28} {segundos:>10.2f} {args.requisicoes / segundos:>10,.0f} {falhas:>7}")
+
+    # Conferência: o serviço devolve as mesmas probabilidades do caminho em lote
+    esperado = prever_risco_evasao(coorte).set_index("id_aluno")["Probabilidade"]
+    obtido = pd.Series({r["resultados"][0]["id_aluno"]: r["resultados"][0]["probabilidade"] for _, r in resultados})
+    diferenca = (obtido.sort_index() - esperado.sort_index()).abs().max()
+    print(f"\nmaior diferença de probabilidade vs. prever_risco_evasao em lote: {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Gerador de coortes sintéticas no formato de entrada de dataset/dataSetSintetico.csv.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.gerar_coorte 100000 dataset/coorte_100k.csv --fracao-ausentes 0.1
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+N_DISCIPLINAS = 10
+COLUNAS_NOTAS = [f"nota_disciplina{i}" for i in range(1, N_DISCIPLINAS + 1)]
+COLUNAS_ENTRADA = (
+    ["id_aluno", "semestre_atual", "total_semestres_cursados"] + COLUNAS_NOTAS +
+    ["media_notas", "taxa_aprovacao", "frequencia", "evadiu", "qtd_trancamentos"]
+)
+TAMANHO_BLOCO_ESCRITA = 200_000
+
+
+def gerar_coorte(linhas: int, semente: int = 42, fracao_ausentes: float = 0.1, id_inicial: int = 1) -> pd.DataFrame:
+    """
+    Gera linhas alunos com as mesmas colunas e faixas da base sintética.
+
+    Args:
+        fracao_ausentes: fração das notas por disciplina deixadas em branco (NaN).
+        id_inicial: primeiro id_aluno (permite gerar coortes grandes em partes sem repetir ids).
+
+    Returns:
+        DataFrame com as colunas de COLUNAS_ENTRADA, ainda sem as colunas calculadas pelo modelo.
+    """
+    rng = np.random.default_rng(semente)
+
+    notas = rng.uniform(0, 10, size=(linhas, N_DISCIPLINAS)).round(2)
+    notas[rng.random(size=notas.shape) < fracao_ausentes] = np.nan
+
+    df = pd.DataFrame(notas, columns=COLUNAS_NOTAS)
+    df.insert(0, "id_aluno", np.arange(id_inicial, id_inicial + linhas))
+    df.insert(1, "semestre_atual", rng.integers(1, 11, size=linhas))
+    df.insert(2, "total_semestres_cursados", rng.integers(1, 11, size=linhas))
+    df["media_notas"] = rng.uniform(0, 10, size=linhas).round(2)
+    df["taxa_aprovacao"] = rng.uniform(0, 1, size=linhas).round(2)
+    df["frequencia"] = rng.integers(0, 101, size=linhas)
+    df["evadiu"] = rng.integers(0, 2, size=linhas)
+    df["qtd_trancamentos"] = rng.integers(0, 5, size=linhas)
+    return df
+
+
+def gravar_coorte_csv(linhas: int, caminho: str, semente: int = 42, fracao_ausentes: float = 0.1) -> str:
+    # Gera e grava em blocos: 1M de linhas não precisa caber inteiro em memória
+    for i, inicio in enumerate(range(0, linhas, TAMANHO_BLOCO_ESCRITA)):
+        tamanho = min(TAMANHO_BLOCO_ESCRITA, linhas - inicio)
+        bloco = gerar_coorte(tamanho, semente=semente + i, fracao_ausentes=fracao_ausentes, id_inicial=inicio + 1)
+        bloco.to_csv(caminho, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("linhas", type=int)
+    parser.add_argument("saida", help="CSV de saída")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--fracao-ausentes", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    gravar_coorte_csv(args.linhas, args.saida, semente=args.semente, fracao_ausentes=args.fracao_ausentes)
+    print(f"{args.linhas} alunos gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
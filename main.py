@@ -1,10 +1,25 @@
+import threading
+
 import streamlit as st
-from views.coordenador_view import painel_coordenador
-from views.professor_view import painel_professor
 from auth import login, logout
 
 st.set_page_config(page_title="Dashboard Acompanhamento Acadêmico", layout="wide")
 
+# Os painéis (e com eles pandas, plotly, reportlab, matplotlib e o modelo) só são
+# importados no primeiro acesso de cada perfil: a tela de login não espera por eles.
+_precarga = None
+
+def precarregar_paineis():
+    # Depois que o formulário de login já foi enviado ao navegador, importa os painéis em
+    # segundo plano (uma vez por processo), para que o primeiro acesso após o login também seja rápido
+    global _precarga
+    if _precarga is None:
+        def _importar():
+            import views.coordenador_view
+            import views.professor_view
+        _precarga = threading.Thread(target=_importar, daemon=True, name="precarga-paineis")
+        _precarga.start()
+
 def main():
     st.sidebar.image("assets/logo_upe.png", use_container_width=True)
 
@@ -13,10 +28,13 @@ def main():
 
     if not st.session_state.logado:
         login()
+        precarregar_paineis()
     else:
         if st.session_state.tipo_usuario == "coordenador":
+            from views.coordenador_view import painel_coordenador
             painel_coordenador()
         elif st.session_state.tipo_usuario == "professor":
+            from views.professor_view import painel_professor
             painel_professor()
         else:
             st.error("Tipo de usuário desconhecido.")
@@ -0,0 +1,100 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# ======================
+# Features derivadas das notas (compartilhadas entre treino e inferência)
+# ======================
+# As notas ausentes (NaN) são ignoradas: a tendência é calculada sobre as notas
+# disponíveis, na ordem das colunas, com X = 0, 1, ..., k-1 — exatamente como a
+# LinearRegression ajustada aluno a aluno fazia antes.
+
+def matriz_notas(df: pd.DataFrame, grade_cols) -> np.ndarray:
+    """Retorna a matriz (n_alunos x n_notas) em float, apenas com as colunas de nota presentes no DataFrame."""
+    presentes = [col for col in grade_cols if col in df.columns]
+    if not presentes:
+        return np.empty((len(df), 0), dtype=float)
+    return df[presentes].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _somar_linhas(valores: np.ndarray) -> np.ndarray:
+    # Soma coluna a coluna, da esquerda para a direita: o resultado de cada linha não depende
+    # de quantas linhas a matriz tem (np.sum muda a ordem das parcelas conforme o formato),
+    # então um aluno sozinho recebe exatamente os mesmos valores que receberia no lote.
+    total = np.zeros(len(valores), dtype=float)
+    for j in range(valores.shape[1]):
+        total += valores[:, j]
+    return total
+
+
+def calcular_slope_notas(notas: np.ndarray) -> np.ndarray:
+    """Inclinação de mínimos quadrados das notas disponíveis de cada linha (0 se houver menos de 2 notas)."""
+    notas = np.asarray(notas, dtype=float)
+    mascara = ~np.isnan(notas)
+    n = mascara.sum(axis=1)
+
+    # Posição de cada nota entre as notas disponíveis da linha (0, 1, ..., k-1)
+    x = np.cumsum(mascara, axis=1) - 1
+    x_medio = (n - 1) / 2.0
+    sxx = n * (n * n - 1) / 12.0
+
+    y = np.where(mascara, notas, 0.0)
+    sxy = _somar_linhas(np.where(mascara, (x - x_medio[:, None]) * y, 0.0))
+
+    slope = np.zeros(len(notas), dtype=float)
+    validos = n >= 2
+    slope[validos] = sxy[validos] / sxx[validos]
+    return slope
+
+
+def calcular_std_notas(notas: np.ndarray) -> np.ndarray:
+    """Desvio padrão amostral (ddof=1) das notas disponíveis de cada linha (0 se houver menos de 2 notas)."""
+    notas = np.asarray(notas, dtype=float)
+    mascara = ~np.isnan(notas)
+    n = mascara.sum(axis=1)
+
+    soma = _somar_linhas(np.where(mascara, notas, 0.0))
+    media = np.divide(soma, n, out=np.zeros(len(notas), dtype=float), where=n > 0)
+    desvios = np.where(mascara, notas - media[:, None], 0.0)
+
+    std = np.zeros(len(notas), dtype=float)
+    validos = n >= 2
+    std[validos] = np.sqrt(_somar_linhas(desvios[validos] ** 2) / (n[validos] - 1))
+    return std
+
+
+def calcular_features_notas_aluno(notas):
+    """
+    slope_notas e std_notas de um único aluno (sequência de notas, None/NaN = ausente).
+
+    Mesmas operações, na mesma ordem, de calcular_slope_notas/calcular_std_notas, em floats
+    Python: o resultado é idêntico ao do lote, sem o custo fixo das chamadas NumPy.
+    """
+    valores = [None if v is None or math.isnan(v) else float(v) for v in notas]
+    n = sum(v is not None for v in valores)
+    if n < 2:
+        return 0.0, 0.0
+
+    x_medio = (n - 1) / 2.0
+    sxx = n * (n * n - 1) / 12.0
+    sxy, soma, x = 0.0, 0.0, -1
+    for v in valores:
+        if v is not None:
+            x += 1
+            sxy += (x - x_medio) * v
+            soma += v
+
+    media = soma / n
+    quadrados = 0.0
+    for v in valores:
+        if v is not None:
+            desvio = v - media
+            quadrados += desvio * desvio
+    return sxy / sxx, math.sqrt(quadrados / (n - 1))
+
+
+def calcular_features_notas(df: pd.DataFrame, grade_cols):
+    """Calcula slope_notas e std_notas para todas as linhas de uma vez. Retorna (slope, std)."""
+    notas = matriz_notas(df, grade_cols)
+    return calcular_slope_notas(notas), calcular_std_notas(notas)
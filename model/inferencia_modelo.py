@@ -1,73 +1,103 @@
-import pandas as pd
-import joblib
 import numpy as np
-from sklearn.linear_model import LinearRegression
+import pandas as pd
+from model.engenharia_features import calcular_features_notas
+from model.mlp_numpy import MLPNumpy
+from model.normalizacao import aplicar_normalizacao
+from model.registro_modelo import obter_artefatos, versao_modelo
+from utils.metricas import etapa
 
 # ======================
-# Carregar os objetos salvos
+# Objetos salvos
 # ======================
-modelo = joblib.load("model/modelo_mlp.pkl")
-scalers = joblib.load("model/scalers.pkl")
-features = joblib.load("model/features.pkl")
-grade_cols = joblib.load("model/grade_cols.pkl")
-limiares = joblib.load("model/limiares_risco.pkl")
-limiar_baixo, limiar_medio = limiares
+# Os artefatos são carregados no primeiro uso pelo registro (model/registro_modelo.py),
+# compartilhados por todas as sessões do processo e recarregados quando os arquivos mudam.
+# Os nomes antigos do módulo (modelo, features, grade_cols, ...) continuam disponíveis.
+_ATRIBUTOS_ARTEFATOS = {"modelo", "features", "grade_cols", "media_features", "escala_features", "limiar_baixo", "limiar_medio"}
+
+def __getattr__(nome):
+    if nome in _ATRIBUTOS_ARTEFATOS:
+        return getattr(obter_artefatos(), nome)
+    if nome == "limiares":
+        artefatos = obter_artefatos()
+        return artefatos.limiar_baixo, artefatos.limiar_medio
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 # ======================
 # Classificação por risco
 # ======================
-def classificar_risco(prob):
-    if prob <= limiar_baixo:
+def classificar_risco(prob, artefatos=None):
+    artefatos = artefatos or obter_artefatos()
+    if prob <= artefatos.limiar_baixo:
         return "🟢 Baixo"
-    elif prob <= limiar_medio:
+    elif prob <= artefatos.limiar_medio:
         return "🟠 Médio"
     else:
         return "🔴 Alto"
 
+ROTULOS_RISCO = np.array(["🟢 Baixo", "🟠 Médio", "🔴 Alto"], dtype=object)
+
+def classificar_riscos(prob, artefatos=None) -> np.ndarray:
+    # Versão vetorizada de classificar_risco para um array de probabilidades
+    artefatos = artefatos or obter_artefatos()
+    prob = np.asarray(prob)
+    # Códigos 0/1/2 e uma única indexação no vetor de rótulos (np.select com strings cria um array de texto
+    # e o converte para object, várias vezes mais lento); NaN cai em "🔴 Alto", como em classificar_risco
+    codigos = np.where(prob <= artefatos.limiar_baixo, 0, np.where(prob <= artefatos.limiar_medio, 1, 2))
+    return ROTULOS_RISCO[codigos]
+
 # ======================
-# Função principal
+# Etapas do pipeline
 # ======================
-def prever_risco_evasao(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-
+def preparar_colunas(df: pd.DataFrame, artefatos, slope_std=None) -> pd.DataFrame:
+    """Completa colunas ausentes e grava slope_notas/std_notas no próprio df (slope_std já calculados, se informados)."""
     # Garantir que colunas estejam presentes
-    for col in features:
+    for col in artefatos.features:
         if col not in df.columns:
             df[col] = 0
 
-    # slope das notas
-    def calcular_slope(row):
-        notas = [row[col] for col in grade_cols if col in df.columns and pd.notna(row[col])]
-        if len(notas) < 2:
-            return 0
-        X = np.arange(len(notas)).reshape(-1, 1)
-        y = np.array(notas)
-        model_lr = LinearRegression()
-        model_lr.fit(X, y)
-        return model_lr.coef_[0]
-    df["slope_notas"] = df.apply(calcular_slope, axis=1)
-
-    # std das notas
-    #df["std_notas"] = df[grade_cols].std(axis=1).fillna(0)
-    notas_disponiveis = [col for col in grade_cols if col in df.columns]
-    df["std_notas"] = df[notas_disponiveis].std(axis=1).fillna(0)
+    # slope e std das notas (vetorizados sobre a matriz de notas)
+    if slope_std is None:
+        with etapa("prever.features_notas", len(df)):
+            slope_std = calcular_features_notas(df, artefatos.grade_cols)
+    df["slope_notas"], df["std_notas"] = slope_std
 
     # Preencher colunas ausentes com 0
-    for col in grade_cols:
+    for col in artefatos.grade_cols:
         if col not in df.columns:
             df[col] = 0
+    return df
 
-    # Normalizar features
-    df_proc = df[features].copy()
-    for col in features:
-        scaler = scalers.get(col)
-        if scaler:
-            df_proc[[col]] = scaler.transform(df_proc[[col]])
 
-    # Prever
-    prob = modelo.predict_proba(df_proc)[:, 1]
+def atribuir_resultado(df: pd.DataFrame, prob, artefatos) -> pd.DataFrame:
     df["Probabilidade"] = prob
-    df["Nível de Risco"] = [classificar_risco(p) for p in prob]
-    df["Previsão Evasão (0/1)"] = (prob >= limiar_medio).astype(int)
-
+    df["Nível de Risco"] = classificar_riscos(prob, artefatos)
+    df["Previsão Evasão (0/1)"] = (prob >= artefatos.limiar_medio).astype(int)
     return df
+
+# ======================
+# Função principal
+# ======================
+def prever_risco_evasao(df: pd.DataFrame, copiar: bool = True, artefatos=None) -> pd.DataFrame:
+    # Uma única versão do modelo é usada do início ao fim da chamada, mesmo se houver troca no meio
+    artefatos = artefatos or obter_artefatos()
+    features = artefatos.features
+
+    # copiar=False escreve as colunas calculadas no próprio df (usado pelo processamento em blocos)
+    if copiar:
+        df = df.copy()
+
+    with etapa("prever.total", len(df)):
+        with etapa("prever.preparar_colunas", len(df)):
+            preparar_colunas(df, artefatos)
+
+        # Normalizar features (uma única transformação afim sobre a matriz)
+        with etapa("prever.normalizacao", len(df)):
+            X_proc = aplicar_normalizacao(df[features].to_numpy(dtype=float), artefatos.media_features, artefatos.escala_features)
+            if not isinstance(artefatos.modelo, MLPNumpy):
+                X_proc = pd.DataFrame(X_proc, columns=features, index=df.index)
+
+        # Prever
+        with etapa("prever.predict_proba", len(df)):
+            prob = artefatos.modelo.predict_proba(X_proc)[:, 1]
+        with etapa("prever.classificacao", len(df)):
+            return atribuir_resultado(df, prob, artefatos)
@@ -0,0 +1,200 @@
+import csv
+import io
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from model.registro_modelo import obter_artefatos
+
+COLUNAS_DERIVADAS = ("slope_notas", "std_notas")  # recalculadas a partir das notas pelo modelo
+# Inteiras quando todos os valores são inteiros (frequencia pode vir com casas decimais: fica float64)
+COLUNAS_INTEIRAS = ("id_aluno", "semestre_atual", "total_semestres_cursados", "qtd_trancamentos", "evadiu", "frequencia")
+COLUNAS_TEXTO = ("nome_aluno",)
+# Colunas fora do modelo que as telas e relatórios usam
+COLUNAS_APOIO = ("id_aluno", "nome_aluno", "semestre_atual", "evadiu")
+
+# Faixas válidas (mínimo, máximo); None = sem limite
+FAIXAS = {
+    "media_notas": (0, 10),
+    "frequencia": (0, 100),
+    "taxa_aprovacao": (0, 1),
+    "total_semestres_cursados": (0, None),
+    "qtd_trancamentos": (0, None),
+    "semestre_atual": (1, None),
+    "evadiu": (0, 1),
+}
+FAIXA_NOTAS = (0, 10)
+MAX_EXEMPLOS = 3
+SITUACOES_OK = ("ok", "opcional ausente", "ignorada")
+
+# ======================
+# Esquema esperado
+# ======================
+class ErroIngestao(ValueError):
+    """Arquivo que não dá para pontuar: CSV malformado ou sem nenhuma coluna de entrada do modelo."""
+
+
+@dataclass
+class ResultadoIngestao:
+    df: pd.DataFrame
+    relatorio: pd.DataFrame  # uma linha por coluna do esquema e por coluna ignorada (ver relatorio_ingestao)
+
+    @property
+    def problemas(self) -> pd.DataFrame:
+        return problemas_ingestao(self.relatorio)
+
+    @property
+    def ignoradas(self) -> list:
+        return self.relatorio.loc[self.relatorio["situação"] == "ignorada", "coluna"].tolist()
+
+
+def esquema_entrada(artefatos=None) -> dict:
+    """Colunas lidas do CSV e seus tipos ("inteiro", "real" ou "texto"), a partir de features.pkl e grade_cols.pkl."""
+    artefatos = artefatos or obter_artefatos()
+    colunas = list(COLUNAS_APOIO) + [col for col in artefatos.features if col not in COLUNAS_DERIVADAS]
+    colunas += list(artefatos.grade_cols)
+    esquema = {}
+    for col in colunas:
+        esquema[col] = "texto" if col in COLUNAS_TEXTO else "inteiro" if col in COLUNAS_INTEIRAS else "real"
+    return esquema
+
+
+def _faixa(col, artefatos):
+    return FAIXA_NOTAS if col in artefatos.grade_cols else FAIXAS.get(col)
+
+# ======================
+# Leitura
+# ======================
+def _cabecalho(entrada) -> list:
+    if hasattr(entrada, "read"):
+        entrada.seek(0)
+        linha = entrada.readline()
+        entrada.seek(0)
+        if isinstance(linha, bytes):
+            linha = linha.decode("utf-8-sig")
+    else:
+        with open(entrada, encoding="utf-8-sig") as f:
+            linha = f.readline()
+    return next(csv.reader(io.StringIO(linha)), [])
+
+
+def _ler_arrow(entrada, colunas, tipos) -> pd.DataFrame:
+    if hasattr(entrada, "read"):
+        entrada.seek(0)
+    opcoes = pacsv.ConvertOptions(include_columns=colunas, column_types=tipos, strings_can_be_null=True)
+    return pacsv.read_csv(entrada, convert_options=opcoes).to_pandas()
+
+
+def _coagir(bruto: pd.Series, tipo: str):
+    """Converte texto para número; devolve a coluna convertida e os valores originais que não eram números."""
+    texto = bruto.str.strip()
+    valores = pd.to_numeric(texto, errors="coerce")
+    invalidos = bruto[texto.notna() & (texto != "") & valores.isna()]
+    if tipo == "inteiro" and valores.notna().all() and (valores % 1 == 0).all():
+        valores = valores.astype("int64")
+    else:
+        valores = valores.astype("float64")
+    return valores, invalidos
+
+
+def ler_csv_alunos(entrada, artefatos=None) -> ResultadoIngestao:
+    """
+    Lê um CSV de alunos com o esquema esperado pelo modelo.
+
+    Só as colunas do esquema são lidas, com tipos fixos e o leitor CSV do pyarrow. Se algum valor
+    não puder ser convertido (ex.: "7,5" ou "abc" numa nota), as colunas numéricas são relidas como
+    texto e convertidas uma a uma: esses valores viram vazios e aparecem no relatório.
+
+    Args:
+        entrada: caminho ou arquivo (ex.: UploadedFile do Streamlit) com o CSV.
+
+    Returns:
+        ResultadoIngestao com o DataFrame e o relatório por coluna (inclusive as ignoradas, fora do esquema).
+
+    Raises:
+        ErroIngestao: se nenhuma coluna de entrada do modelo estiver no arquivo ou se o CSV estiver malformado.
+    """
+    artefatos = artefatos or obter_artefatos()
+    esquema = esquema_entrada(artefatos)
+    cabecalho = _cabecalho(entrada)
+    presentes = [col for col in cabecalho if col in esquema]  # na ordem do arquivo
+    entradas_modelo = [col for col in esquema if col not in COLUNAS_APOIO]
+    if not any(col in presentes for col in entradas_modelo):
+        raise ErroIngestao(
+            "Nenhuma coluna de entrada do modelo encontrada no arquivo. Esperadas: " + ", ".join(entradas_modelo)
+        )
+
+    tipos_arrow = {"inteiro": pa.int64(), "real": pa.float64(), "texto": pa.string()}
+    invalidos = {}
+    try:
+        df = _ler_arrow(entrada, presentes, {col: tipos_arrow[esquema[col]] for col in presentes})
+    except pa.ArrowInvalid:
+        # Valor fora do tipo em alguma coluna: lê tudo como texto e converte coluna a coluna
+        try:
+            df = _ler_arrow(entrada, presentes, {col: pa.string() for col in presentes})
+        except pa.ArrowInvalid as erro:  # estrutura do CSV (ex.: linha com colunas a mais)
+            raise ErroIngestao(f"CSV inválido: {erro}") from erro
+        for col in presentes:
+            if esquema[col] != "texto":
+                df[col], invalidos[col] = _coagir(df[col], esquema[col])
+
+    ignoradas = [col for col in cabecalho if col not in esquema]
+    return ResultadoIngestao(df=df, relatorio=relatorio_ingestao(df, esquema, invalidos, artefatos, ignoradas))
+
+# ======================
+# Relatório de conversão e validação
+# ======================
+def relatorio_ingestao(df: pd.DataFrame, esquema: dict, invalidos: dict = None, artefatos=None, ignoradas=()) -> pd.DataFrame:
+    """
+    Uma linha por coluna do esquema: situação, vazios, valores inválidos (não numéricos),
+    valores fora da faixa e alguns exemplos dos valores com problema.
+
+    Args:
+        invalidos: {coluna: Series com os valores originais que não puderam ser convertidos}.
+        ignoradas: colunas do arquivo fora do esquema (não lidas).
+    """
+    artefatos = artefatos or obter_artefatos()
+    invalidos = invalidos or {}
+    linhas = []
+    for col, tipo in esquema.items():
+        if col not in df.columns:
+            situacao = "opcional ausente" if col in COLUNAS_APOIO else "ausente (o modelo usa 0)"
+            linhas.append({"coluna": col, "tipo": tipo, "situação": situacao,
+                           "vazios": len(df), "inválidos": 0, "fora da faixa": 0, "exemplos": ""})
+            continue
+
+        valores = df[col]
+        originais = invalidos.get(col, valores.iloc[:0])
+        n_invalidos = len(originais)
+        exemplos = [repr(v) for v in originais.head(MAX_EXEMPLOS)]
+
+        fora = 0
+        faixa = _faixa(col, artefatos)
+        if faixa is not None and tipo != "texto":
+            minimo, maximo = faixa
+            mascara_fora = pd.Series(False, index=valores.index)
+            if minimo is not None:
+                mascara_fora |= valores < minimo
+            if maximo is not None:
+                mascara_fora |= valores > maximo
+            fora = int(mascara_fora.sum())
+            if fora and len(exemplos) < MAX_EXEMPLOS:
+                exemplos += [str(v) for v in valores[mascara_fora].head(MAX_EXEMPLOS - len(exemplos))]
+
+        vazios = int(valores.isna().sum()) - n_invalidos
+        problema = n_invalidos or fora or (vazios and col not in artefatos.grade_cols and col not in COLUNAS_APOIO)
+        linhas.append({
+            "coluna": col, "tipo": tipo, "situação": "com problemas" if problema else "ok",
+            "vazios": vazios, "inválidos": n_invalidos, "fora da faixa": fora, "exemplos": ", ".join(exemplos),
+        })
+    for col in ignoradas:
+        linhas.append({"coluna": col, "tipo": "", "situação": "ignorada",
+                       "vazios": 0, "inválidos": 0, "fora da faixa": 0, "exemplos": ""})
+    return pd.DataFrame(linhas)
+
+
+def problemas_ingestao(relatorio: pd.DataFrame) -> pd.DataFrame:
+    """Linhas do relatório que pedem atenção (colunas ausentes do modelo, valores inválidos, vazios ou fora da faixa)."""
+    return relatorio[~relatorio["situação"].isin(SITUACOES_OK)]
@@ -0,0 +1,99 @@
+import numpy as np
+
+CAMINHO_PESOS = "model/modelo_mlp_pesos.npz"
+
+# ======================
+# Funções de ativação (mesmas do sklearn.neural_network)
+# ======================
+def _identity(x):
+    return x
+
+def _logistic(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _tanh(x):
+    return np.tanh(x)
+
+def _relu(x):
+    return np.maximum(x, 0)
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    return x / x.sum(axis=1, keepdims=True)
+
+ATIVACOES = {"identity": _identity, "logistic": _logistic, "tanh": _tanh, "relu": _relu, "softmax": _softmax}
+
+# ======================
+# Motor de inferência
+# ======================
+class MLPNumpy:
+    """Forward pass em float32 de uma rede exportada de um MLPClassifier, sem depender do sklearn."""
+
+    def __init__(self, coefs, intercepts, activation, out_activation):
+        self.coefs_ = [np.ascontiguousarray(c, dtype=np.float32) for c in coefs]
+        self.intercepts_ = [np.ascontiguousarray(b, dtype=np.float32) for b in intercepts]
+        self.activation = activation
+        self.out_activation_ = out_activation
+        self.n_features_in_ = self.coefs_[0].shape[0]
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO_PESOS):
+        with np.load(caminho, allow_pickle=False) as pesos:
+            n_camadas = int(pesos["n_camadas"])
+            coefs = [pesos[f"coef_{i}"] for i in range(n_camadas)]
+            intercepts = [pesos[f"intercept_{i}"] for i in range(n_camadas)]
+            return cls(coefs, intercepts, str(pesos["activation"]), str(pesos["out_activation"]))
+
+    def _forward(self, X):
+        ativacao = ATIVACOES[self.activation]
+        h = np.asarray(X, dtype=np.float32)
+        ultima = len(self.coefs_) - 1
+        for i, (W, b) in enumerate(zip(self.coefs_, self.intercepts_)):
+            h = h @ W
+            h += b
+            h = ATIVACOES[self.out_activation_](h) if i == ultima else ativacao(h)
+        return h
+
+    def predict_proba(self, X):
+        saida = self._forward(X)
+        if self.out_activation_ == "logistic" and saida.shape[1] == 1:
+            saida = saida.ravel()
+            return np.column_stack([1 - saida, saida])
+        return saida
+
+# ======================
+# Exportação a partir do MLPClassifier treinado
+# ======================
+def exportar_pesos(modelo, caminho=CAMINHO_PESOS):
+    """Salva coefs_, intercepts_ e ativações de um MLPClassifier em um arquivo .npz compacto (float32)."""
+    pesos = {
+        "n_camadas": np.array(len(modelo.coefs_)),
+        "activation": np.array(modelo.activation),
+        "out_activation": np.array(modelo.out_activation_),
+    }
+    for i, (W, b) in enumerate(zip(modelo.coefs_, modelo.intercepts_)):
+        pesos[f"coef_{i}"] = W.astype(np.float32)
+        pesos[f"intercept_{i}"] = b.astype(np.float32)
+    np.savez(caminho, **pesos)
+
+
+def verificar_equivalencia(modelo, motor, X, tolerancia=1e-5):
+    """Compara predict_proba do sklearn com o motor NumPy. Retorna a maior diferença absoluta."""
+    diferenca = float(np.abs(modelo.predict_proba(X) - motor.predict_proba(X)).max())
+    if diferenca > tolerancia:
+        raise ValueError(f"Motor NumPy diverge do sklearn: diferença máxima {diferenca:.2e} > {tolerancia:.0e}")
+    return diferenca
+
+
+if __name__ == "__main__":
+    # Exporta model/modelo_mlp.pkl e confere o resultado (executar a partir da raiz do projeto)
+    import joblib
+
+    modelo = joblib.load("model/modelo_mlp.pkl")
+    exportar_pesos(modelo)
+    motor = MLPNumpy.carregar()
+
+    X = np.random.default_rng(42).normal(size=(10_000, motor.n_features_in_))
+    diferenca = verificar_equivalencia(modelo, motor, X)
+    print(f"Pesos exportados para {CAMINHO_PESOS} (diferença máxima para o sklearn: {diferenca:.2e})")
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+
+CAMINHO_NORMALIZACAO = "model/normalizacao.npz"
+CAMINHO_SCALERS = "model/scalers.pkl"
+
+# ======================
+# Normalização fundida
+# ======================
+# O dicionário de StandardScaler (um por feature) vira um único par de vetores
+# média/escala, aplicado como uma transformação afim sobre a matriz de features.
+# Features sem scaler ficam inalteradas (média 0, escala 1), como antes.
+
+def compilar_scalers(scalers: dict, features):
+    """Converte o dicionário {feature: StandardScaler} em vetores (media, escala) na ordem de features."""
+    media = np.zeros(len(features), dtype=float)
+    escala = np.ones(len(features), dtype=float)
+    for i, col in enumerate(features):
+        scaler = scalers.get(col)
+        if not scaler:
+            continue
+        if getattr(scaler, "mean_", None) is not None:
+            media[i] = scaler.mean_[0]
+        if getattr(scaler, "scale_", None) is not None:
+            escala[i] = scaler.scale_[0]
+    return media, escala
+
+
+def aplicar_normalizacao(X: np.ndarray, media: np.ndarray, escala: np.ndarray) -> np.ndarray:
+    """Aplica (X - media) / escala de uma vez sobre a matriz (n_alunos x n_features)."""
+    return (np.asarray(X, dtype=float) - media) / escala
+
+
+def salvar_normalizacao(media, escala, features, caminho=CAMINHO_NORMALIZACAO):
+    np.savez(caminho, media=media, escala=escala, features=np.array(features))
+
+
+def carregar_normalizacao(features, caminho=CAMINHO_NORMALIZACAO, caminho_scalers=CAMINHO_SCALERS):
+    """
+    Carrega os vetores (media, escala) na ordem de features.
+
+    Usa o arquivo compilado quando existe; senão (artefatos antigos), compila a partir de scalers.pkl.
+    """
+    if os.path.exists(caminho):
+        with np.load(caminho, allow_pickle=False) as dados:
+            ordem = {col: i for i, col in enumerate(dados["features"].tolist())}
+            if all(col in ordem for col in features):
+                indices = [ordem[col] for col in features]
+                return dados["media"][indices], dados["escala"][indices]
+
+    import joblib
+    return compilar_scalers(joblib.load(caminho_scalers), features)
+
+
+if __name__ == "__main__":
+    # Compila model/scalers.pkl em model/normalizacao.npz (executar a partir da raiz do projeto)
+    import joblib
+
+    features = joblib.load("model/features.pkl")
+    media, escala = compilar_scalers(joblib.load(CAMINHO_SCALERS), features)
+    salvar_normalizacao(media, escala, features)
+    print(f"Normalização compilada em {CAMINHO_NORMALIZACAO}")
@@ -0,0 +1,88 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from model.engenharia_features import calcular_features_notas_aluno
+from model.inferencia_modelo import classificar_risco
+from model.mlp_numpy import MLPNumpy
+from model.registro_modelo import obter_artefatos
+
+FEATURES_DERIVADAS = ("slope_notas", "std_notas")
+
+# ======================
+# Previsão de um único aluno
+# ======================
+# Caminho rápido para formulários (aba "Aluno Manual", edições do tipo "e se?"):
+# sem DataFrame, sem cópias; as features das notas são calculadas em Python puro
+# e o aluno vai direto para um vetor NumPy já alocado e para o forward pass.
+# Mesmas operações, normalização e modelo de prever_risco_evasao: o resultado é
+# idêntico ao de prever_risco_evasao com um DataFrame de uma linha.
+
+_buffers = threading.local()  # um vetor de features por thread (o Streamlit atende sessões em threads)
+
+
+def colunas_entrada(artefatos=None) -> list:
+    """Ordem esperada quando o aluno é passado como sequência: features de entrada e depois as notas."""
+    artefatos = artefatos or obter_artefatos()
+    return [col for col in artefatos.features if col not in FEATURES_DERIVADAS] + list(artefatos.grade_cols)
+
+
+def _vetor(artefatos):
+    if getattr(_buffers, "versao", None) != artefatos.versao:
+        _buffers.versao = artefatos.versao
+        _buffers.X = np.empty((1, len(artefatos.features)), dtype=float)
+    return _buffers.X
+
+
+def _numero(valor) -> float:
+    return math.nan if valor is None else float(valor)
+
+
+def prever_aluno(aluno, artefatos=None) -> dict:
+    """
+    Prevê o risco de evasão de um aluno.
+
+    Args:
+        aluno: dicionário com as features e as notas (nota_disciplina1..10, ou "notas" com a
+            sequência de notas), ou sequência de valores na ordem de colunas_entrada().
+            Como no lote, features ausentes valem 0 e notas ausentes (ou None/NaN) ficam de fora
+            de slope_notas e std_notas.
+
+    Returns:
+        dict com slope_notas, std_notas, Probabilidade, Nível de Risco e Previsão Evasão (0/1).
+    """
+    artefatos = artefatos or obter_artefatos()
+    if not isinstance(aluno, dict):
+        aluno = dict(zip(colunas_entrada(artefatos), aluno))
+    X = _vetor(artefatos)
+
+    notas = aluno.get("notas")
+    if notas is None:
+        notas = [aluno.get(col) for col in artefatos.grade_cols]
+    notas = [_numero(nota) for nota in list(notas)[:len(artefatos.grade_cols)]]
+    slope, std = calcular_features_notas_aluno(notas)
+
+    for i, col in enumerate(artefatos.features):
+        if col == "slope_notas":
+            X[0, i] = slope
+        elif col == "std_notas":
+            X[0, i] = std
+        else:
+            X[0, i] = _numero(aluno.get(col, 0))
+
+    np.subtract(X, artefatos.media_features, out=X)
+    np.divide(X, artefatos.escala_features, out=X)
+
+    entrada = X if isinstance(artefatos.modelo, MLPNumpy) else pd.DataFrame(X, columns=artefatos.features)
+    prob = float(artefatos.modelo.predict_proba(entrada)[0, 1])
+
+    # Mesma ordem das colunas acrescentadas por prever_risco_evasao
+    return {
+        "slope_notas": slope,
+        "std_notas": std,
+        "Probabilidade": prob,
+        "Nível de Risco": classificar_risco(prob, artefatos),
+        "Previsão Evasão (0/1)": int(prob >= artefatos.limiar_medio),
+    }
@@ -0,0 +1,110 @@
+import argparse
+import os
+
+import pandas as pd
+
+from model.inferencia_modelo import prever_risco_evasao
+
+NIVEIS_RISCO = ["🟢 Baixo", "🟠 Médio", "🔴 Alto"]
+TAMANHO_BLOCO_PADRAO = 50_000
+
+# ======================
+# Agregados calculados bloco a bloco
+# ======================
+class AcumuladorRisco:
+    """Mantém contagens por nível de risco e médias por semestre sem guardar as linhas já processadas."""
+
+    def __init__(self):
+        self.total = 0
+        self.soma_probabilidade = 0.0
+        self.contagem_risco = {nivel: 0 for nivel in NIVEIS_RISCO}
+        self._por_semestre = None  # DataFrame com soma e contagem de Probabilidade por semestre
+
+    def atualizar(self, df_bloco: pd.DataFrame):
+        self.total += len(df_bloco)
+        self.soma_probabilidade += float(df_bloco["Probabilidade"].sum())
+
+        for nivel, qtd in df_bloco["Nível de Risco"].value_counts().items():
+            self.contagem_risco[nivel] = self.contagem_risco.get(nivel, 0) + int(qtd)
+
+        if "semestre_atual" in df_bloco.columns:
+            parcial = df_bloco.groupby("semestre_atual")["Probabilidade"].agg(["sum", "count"])
+            if self._por_semestre is None:
+                self._por_semestre = parcial
+            else:
+                self._por_semestre = self._por_semestre.add(parcial, fill_value=0)
+
+    @property
+    def media_probabilidade(self):
+        return self.soma_probabilidade / self.total if self.total else 0.0
+
+    def media_por_semestre(self) -> pd.DataFrame:
+        if self._por_semestre is None:
+            return pd.DataFrame(columns=["semestre_atual", "Probabilidade", "Total de Alunos"])
+        resumo = self._por_semestre.sort_index()
+        return pd.DataFrame({
+            "semestre_atual": resumo.index,
+            "Probabilidade": (resumo["sum"] / resumo["count"]).to_numpy(),
+            "Total de Alunos": resumo["count"].astype(int).to_numpy(),
+        })
+
+# ======================
+# Pontuação em blocos
+# ======================
+def pontuar_csv_em_blocos(entrada, saida, tamanho_bloco=TAMANHO_BLOCO_PADRAO, ao_processar_bloco=None) -> AcumuladorRisco:
+    """
+    Lê o CSV de entrada em blocos de tamanho fixo, pontua cada bloco e grava o resultado incrementalmente.
+
+    Args:
+        entrada (str | arquivo): Caminho ou objeto de arquivo do CSV com os dados dos alunos.
+        saida (str | arquivo): Caminho ou objeto de arquivo (modo texto) onde o CSV pontuado é gravado.
+        tamanho_bloco (int): Quantidade de linhas lidas e pontuadas por vez.
+        ao_processar_bloco (callable): Opcional, chamado como f(acumulador) após cada bloco (ex.: barra de progresso).
+
+    Returns:
+        AcumuladorRisco: Agregados (contagens por risco, médias por semestre) de todas as linhas processadas.
+    """
+    acumulador = AcumuladorRisco()
+    primeiro_bloco = True
+
+    for bloco in pd.read_csv(entrada, chunksize=tamanho_bloco):
+        # O bloco já é uma cópia própria: não é preciso duplicá-lo novamente
+        bloco = prever_risco_evasao(bloco, copiar=False)
+        bloco.to_csv(saida, mode="w" if primeiro_bloco else "a", header=primeiro_bloco, index=False)
+        primeiro_bloco = False
+
+        acumulador.atualizar(bloco)
+        if ao_processar_bloco is not None:
+            ao_processar_bloco(acumulador)
+
+    return acumulador
+
+# ======================
+# Linha de comando
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pontua um CSV de alunos em blocos, sem carregar o arquivo inteiro em memória.")
+    parser.add_argument("entrada", help="CSV com os dados dos alunos")
+    parser.add_argument("saida", help="CSV de saída com Probabilidade e Nível de Risco")
+    parser.add_argument("--tamanho-bloco", type=int, default=TAMANHO_BLOCO_PADRAO, help="linhas por bloco (padrão: %(default)s)")
+    args = parser.parse_args(argv)
+
+    def progresso(acumulador):
+        print(f"  {acumulador.total} aluno(s) processado(s)...", flush=True)
+
+    acumulador = pontuar_csv_em_blocos(args.entrada, args.saida, args.tamanho_bloco, progresso)
+
+    print(f"\nArquivo gerado: {os.path.abspath(args.saida)}")
+    print(f"Total de alunos: {acumulador.total}")
+    print(f"Probabilidade média: {acumulador.media_probabilidade:.2%}")
+    for nivel in NIVEIS_RISCO:
+        print(f"  {nivel}: {acumulador.contagem_risco.get(nivel, 0)} aluno(s)")
+
+    media_semestre = acumulador.media_por_semestre()
+    if not media_semestre.empty:
+        print("\nProbabilidade média por semestre:")
+        print(media_semestre.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
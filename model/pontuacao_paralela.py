@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+TAMANHO_PARTICAO_PADRAO = 20_000
+
+# ======================
+# Funções executadas em cada processo
+# ======================
+def _inicializar_worker():
+    # Carrega os artefatos joblib uma única vez por processo e evita que o BLAS
+    # de cada worker abra várias threads disputando os mesmos núcleos
+    threadpool_limits(1)
+    from model.registro_modelo import obter_artefatos
+    obter_artefatos()
+
+
+def _pontuar_particao(particao: pd.DataFrame) -> pd.DataFrame:
+    from model.inferencia_modelo import prever_risco_evasao
+    return prever_risco_evasao(particao, copiar=False)
+
+# ======================
+# API paralela
+# ======================
+def pontuar_em_paralelo(df: pd.DataFrame, n_processos=None, tamanho_particao=TAMANHO_PARTICAO_PADRAO) -> pd.DataFrame:
+    """
+    Divide o DataFrame em partições de linhas e pontua cada uma em um pool de processos.
+
+    Args:
+        df (pd.DataFrame): Dados dos alunos, no mesmo formato aceito por prever_risco_evasao.
+        n_processos (int): Quantidade de processos do pool (padrão: número de núcleos disponíveis).
+        tamanho_particao (int): Quantidade de linhas enviadas a cada tarefa.
+
+    Returns:
+        pd.DataFrame: Resultado de prever_risco_evasao, na mesma ordem das linhas de entrada.
+    """
+    n_processos = n_processos or os.cpu_count() or 1
+    particoes = [df.iloc[inicio:inicio + tamanho_particao] for inicio in range(0, len(df), tamanho_particao)]
+
+    if n_processos == 1 or len(particoes) <= 1:
+        from model.inferencia_modelo import prever_risco_evasao
+        return prever_risco_evasao(df)
+
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_worker) as executor:
+        # executor.map devolve os resultados na ordem das partições
+        resultados = list(executor.map(_pontuar_particao, particoes))
+
+    return pd.concat(resultados)
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+
+from model.mlp_numpy import MLPNumpy
+from model.normalizacao import carregar_normalizacao
+
+DIRETORIO_MODELO = "model"
+ARQUIVOS_ARTEFATOS = [
+    "modelo_mlp_pesos.npz", "modelo_mlp.pkl", "normalizacao.npz", "scalers.pkl",
+    "features.pkl", "grade_cols.pkl", "limiares_risco.pkl",
+]
+# Intervalo mínimo entre duas verificações de alteração dos arquivos (segundos)
+INTERVALO_VERIFICACAO = 2.0
+
+# ======================
+# Conjunto de artefatos de uma versão do modelo
+# ======================
+@dataclass(frozen=True)
+class ArtefatosModelo:
+    modelo: object
+    media_features: np.ndarray
+    escala_features: np.ndarray
+    features: list
+    grade_cols: list
+    limiar_baixo: float
+    limiar_medio: float
+    versao: str
+    carregado_em: float
+
+
+def _caminho(nome):
+    return os.path.join(DIRETORIO_MODELO, nome)
+
+
+def _assinatura_arquivos():
+    """(nome, mtime, tamanho) de cada artefato; muda quando algum arquivo é substituído."""
+    assinatura = []
+    for nome in ARQUIVOS_ARTEFATOS:
+        try:
+            info = os.stat(_caminho(nome))
+            assinatura.append((nome, info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            assinatura.append((nome, None, None))
+    return tuple(assinatura)
+
+
+def _calcular_versao():
+    # Hash do conteúdo dos artefatos existentes: mesma versão em qualquer processo/máquina
+    h = hashlib.sha256()
+    for nome in ARQUIVOS_ARTEFATOS:
+        if os.path.exists(_caminho(nome)):
+            with open(_caminho(nome), "rb") as f:
+                h.update(nome.encode())
+                h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def _carregar_artefatos() -> ArtefatosModelo:
+    if os.path.exists(_caminho("modelo_mlp_pesos.npz")):
+        modelo = MLPNumpy.carregar(_caminho("modelo_mlp_pesos.npz"))
+    else:
+        modelo = joblib.load(_caminho("modelo_mlp.pkl"))
+
+    features = joblib.load(_caminho("features.pkl"))
+    media, escala = carregar_normalizacao(features, _caminho("normalizacao.npz"), _caminho("scalers.pkl"))
+    limiar_baixo, limiar_medio = joblib.load(_caminho("limiares_risco.pkl"))
+
+    return ArtefatosModelo(
+        modelo=modelo,
+        media_features=media,
+        escala_features=escala,
+        features=features,
+        grade_cols=joblib.load(_caminho("grade_cols.pkl")),
+        limiar_baixo=float(limiar_baixo),
+        limiar_medio=float(limiar_medio),
+        versao=_calcular_versao(),
+        carregado_em=time.time(),
+    )
+
+# ======================
+# Registro compartilhado pelo processo (todas as sessões do Streamlit)
+# ======================
+_trava = threading.Lock()
+_estado = None  # (assinatura, artefatos) — substituído de uma só vez na troca de versão
+_ultima_verificacao = 0.0
+
+
+def obter_artefatos() -> ArtefatosModelo:
+    """
+    Retorna os artefatos do modelo, carregando-os no primeiro uso.
+
+    Se algum arquivo em model/ mudar (mtime/tamanho), a nova versão é carregada e passa a ser
+    usada por todas as chamadas seguintes; quem já obteve a versão anterior continua com ela até terminar.
+    """
+    global _estado, _ultima_verificacao
+
+    estado = _estado
+    agora = time.monotonic()
+    if estado is not None and agora - _ultima_verificacao < INTERVALO_VERIFICACAO:
+        return estado[1]
+
+    with _trava:
+        _ultima_verificacao = agora
+        assinatura = _assinatura_arquivos()
+        if _estado is not None and _estado[0] == assinatura:
+            return _estado[1]
+        try:
+            artefatos = _carregar_artefatos()
+        except Exception:
+            # Arquivos ainda sendo gravados: mantém a versão atual e tenta de novo na próxima verificação
+            if _estado is None:
+                raise
+            return _estado[1]
+        _estado = (assinatura, artefatos)
+        return artefatos
+
+
+def versao_modelo() -> str:
+    return obter_artefatos().versao
+
+
+def recarregar():
+    """Força a verificação dos arquivos na próxima chamada de obter_artefatos()."""
+    global _ultima_verificacao
+    _ultima_verificacao = 0.0
+    return obter_artefatos()
@@ -0,0 +1,291 @@
+"""
+Serviço HTTP local de pontuação (sem Streamlit), com agrupamento dinâmico de requisições.
+
+Uso (a partir da raiz do projeto):
+    python -m model.servico_pontuacao --porta 8500 --max-lote 512 --espera-ms 5
+
+Endpoints:
+    POST /pontuar   um aluno (objeto JSON) ou vários (lista, ou {"alunos": [...]})
+    GET  /saude     estado do serviço, versão do modelo e ocupação da fila
+    GET  /metrics   métricas no formato Prometheus (ver utils/metricas.py)
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from model.inferencia_modelo import prever_risco_evasao
+from model.pontuacao_individual import FEATURES_DERIVADAS
+from model.registro_modelo import obter_artefatos
+from utils import metricas
+
+MAX_LOTE_PADRAO = 512            # alunos por chamada ao modelo
+ESPERA_MAXIMA_PADRAO = 0.005     # segundos que o primeiro aluno do lote pode esperar por outros
+MAX_PENDENTES_PADRAO = 20_000    # alunos aguardando pontuação antes de recusar (503)
+MAX_ALUNOS_REQUISICAO = 10_000
+MAX_CORPO = 16 * 1024 * 1024
+
+# ======================
+# Agrupamento em micro-lotes
+# ======================
+class ServicoLotado(Exception):
+    """Fila cheia: o cliente deve tentar de novo mais tarde."""
+
+
+class AgrupadorLotes:
+    """
+    Junta alunos de requisições concorrentes em um único prever_risco_evasao.
+
+    O lote é fechado quando atinge max_lote alunos ou quando o primeiro aluno
+    já esperou espera_maxima segundos. O modelo roda numa thread à parte, então
+    o loop continua aceitando requisições (e montando o próximo lote) enquanto isso.
+    """
+
+    def __init__(self, max_lote=MAX_LOTE_PADRAO, espera_maxima=ESPERA_MAXIMA_PADRAO, max_pendentes=MAX_PENDENTES_PADRAO):
+        self.max_lote = max_lote
+        self.espera_maxima = espera_maxima
+        self.max_pendentes = max_pendentes
+        self.pendentes = 0
+        self.lotes = 0
+        self.alunos = 0
+        self._fila = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pontuacao")
+        self._tarefa = None
+
+    def iniciar(self):
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.create_task(self._loop())
+
+    async def pontuar(self, registros: list) -> list:
+        if self.pendentes + len(registros) > self.max_pendentes:
+            raise ServicoLotado()
+        self.pendentes += len(registros)
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((registros, futuro))
+        return await futuro
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            itens = [await self._fila.get()]
+            total = len(itens[0][0])
+            prazo = loop.time() + self.espera_maxima
+            while total < self.max_lote:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                itens.append(item)
+                total += len(item[0])
+
+            registros = [r for regs, _ in itens for r in regs]
+            try:
+                resultados = await loop.run_in_executor(self._executor, pontuar_registros, registros)
+            except Exception as erro:  # falha do modelo: todas as requisições do lote recebem o erro
+                for _, futuro in itens:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+            else:
+                inicio = 0
+                for regs, futuro in itens:
+                    if not futuro.done():
+                        futuro.set_result(resultados[inicio:inicio + len(regs)])
+                    inicio += len(regs)
+            finally:
+                self.pendentes -= total
+                self.lotes += 1
+                self.alunos += total
+
+
+def pontuar_registros(registros: list) -> list:
+    """Pontua uma lista de dicionários de alunos em uma única chamada ao modelo."""
+    artefatos = obter_artefatos()
+    # Features ausentes valem 0 aluno a aluno, antes de juntar os registros: no DataFrame do lote, uma
+    # feature enviada por outra requisição viraria NaN para quem não a mandou. Notas ausentes ficam
+    # NaN (fora de slope_notas e std_notas), como numa requisição sozinha.
+    padrao = {col: 0 for col in artefatos.features if col not in FEATURES_DERIVADAS}
+    with metricas.etapa("servico.lote", len(registros)):
+        df = prever_risco_evasao(
+            pd.DataFrame.from_records([{**padrao, **registro} for registro in registros]),
+            copiar=False, artefatos=artefatos,
+        )
+    # id_aluno é devolvido como veio (o DataFrame converteria ids ausentes em NaN e os demais em float)
+    return [
+        {
+            "id_aluno": registro.get("id_aluno"),
+            "probabilidade": None if math.isnan(prob) else prob,
+            "nivel_risco": None if math.isnan(prob) else nivel,  # sem probabilidade não há nível (não "Alto")
+            "previsao_evasao": previsao,
+        }
+        for registro, prob, nivel, previsao in zip(
+            registros, df["Probabilidade"].tolist(), df["Nível de Risco"].tolist(), df["Previsão Evasão (0/1)"].tolist()
+        )
+    ]
+
+
+def validar_alunos(corpo):
+    """Normaliza o corpo da requisição para uma lista de alunos; levanta ValueError com a mensagem para o cliente."""
+    alunos = corpo.get("alunos", corpo) if isinstance(corpo, dict) else corpo
+    if isinstance(alunos, dict):
+        alunos = [alunos]
+    if not isinstance(alunos, list) or not alunos:
+        raise ValueError("envie um aluno (objeto) ou uma lista de alunos")
+    if len(alunos) > MAX_ALUNOS_REQUISICAO:
+        raise ValueError(f"no máximo {MAX_ALUNOS_REQUISICAO} alunos por requisição")
+
+    artefatos = obter_artefatos()
+    numericas = set(artefatos.features) | set(artefatos.grade_cols)
+    for i, aluno in enumerate(alunos):
+        if not isinstance(aluno, dict):
+            raise ValueError(f"aluno {i}: esperado um objeto JSON")
+        for col in numericas.intersection(aluno):
+            valor = aluno[col]
+            if valor is not None and (isinstance(valor, bool) or not isinstance(valor, (int, float))):
+                raise ValueError(f"aluno {i}: '{col}' deve ser numérico ou null")
+    return alunos
+
+# ======================
+# HTTP
+# ======================
+MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ServicoPontuacao:
+    def __init__(self, agrupador: AgrupadorLotes):
+        self.agrupador = agrupador
+        self.iniciado_em = time.time()
+
+    async def tratar_conexao(self, leitor, escritor):
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, caminho, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(escritor, 400, {"erro": "requisição inválida"}, manter=False)
+                    break
+
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                try:
+                    tamanho = int(cabecalhos.get("content-length") or 0)
+                    if tamanho < 0:
+                        raise ValueError(tamanho)
+                except ValueError:
+                    await self._responder(escritor, 400, {"erro": "requisição inválida"}, manter=False)
+                    break
+                if tamanho > MAX_CORPO:
+                    await self._responder(escritor, 413, {"erro": "corpo muito grande"}, manter=False)
+                    break
+                corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+                manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                status, resposta, extras = await self._rotear(metodo, caminho.split("?")[0], corpo)
+                await self._responder(escritor, status, resposta, manter, extras)
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _rotear(self, metodo, caminho, corpo):
+        if caminho == "/saude":
+            return 200, self.saude(), None
+        if caminho == "/metrics":
+            return 200, metricas.texto_prometheus(), None
+        if caminho != "/pontuar":
+            return 404, {"erro": "rota não encontrada"}, None
+        if metodo != "POST":
+            return 405, {"erro": "use POST"}, None
+
+        try:
+            alunos = validar_alunos(json.loads(corpo or b"null"))
+        except (ValueError, json.JSONDecodeError) as erro:
+            return 400, {"erro": str(erro)}, None
+        try:
+            resultados = await self.agrupador.pontuar(alunos)
+        except ServicoLotado:
+            return 503, {"erro": "serviço ocupado, tente novamente"}, {"Retry-After": "1"}
+        except Exception as erro:
+            return 500, {"erro": str(erro)}, None
+        return 200, {"versao_modelo": obter_artefatos().versao, "resultados": resultados}, None
+
+    def saude(self) -> dict:
+        artefatos = obter_artefatos()
+        return {
+            "status": "ok",
+            "versao_modelo": artefatos.versao,
+            "em_execucao_ha_s": round(time.time() - self.iniciado_em, 1),
+            "pendentes": self.agrupador.pendentes,
+            "max_pendentes": self.agrupador.max_pendentes,
+            "lotes_processados": self.agrupador.lotes,
+            "alunos_pontuados": self.agrupador.alunos,
+        }
+
+    async def _responder(self, escritor, status, corpo, manter=True, extras=None):
+        if isinstance(corpo, str):
+            dados, tipo = corpo.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            dados, tipo = json.dumps(corpo, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+        cabecalhos = [
+            f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}",
+            f"Content-Type: {tipo}",
+            f"Content-Length: {len(dados)}",
+            f"Connection: {'keep-alive' if manter else 'close'}",
+        ] + [f"{nome}: {valor}" for nome, valor in (extras or {}).items()]
+        escritor.write(("\r\n".join(cabecalhos) + "\r\n\r\n").encode("latin-1") + dados)
+        await escritor.drain()
+
+
+async def iniciar_servico(endereco="127.0.0.1", porta=8500, **opcoes_agrupador):
+    """Sobe o servidor no loop atual e devolve o asyncio.Server (útil para testes e benchmarks)."""
+    obter_artefatos()  # carrega o modelo antes da primeira requisição
+    agrupador = AgrupadorLotes(**opcoes_agrupador)
+    agrupador.iniciar()
+    servico = ServicoPontuacao(agrupador)
+    return await asyncio.start_server(servico.tratar_conexao, endereco, porta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endereco", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8500)
+    parser.add_argument("--max-lote", type=int, default=MAX_LOTE_PADRAO)
+    parser.add_argument("--espera-ms", type=float, default=ESPERA_MAXIMA_PADRAO * 1000)
+    parser.add_argument("--max-pendentes", type=int, default=MAX_PENDENTES_PADRAO)
+    args = parser.parse_args(argv)
+
+    async def _executar():
+        servidor = await iniciar_servico(
+            args.endereco, args.porta,
+            max_lote=args.max_lote, espera_maxima=args.espera_ms / 1000, max_pendentes=args.max_pendentes,
+        )
+        print(f"Serviço de pontuação em http://{args.endereco}:{args.porta} (POST /pontuar, GET /saude)")
+        async with servidor:
+            await servidor.serve_forever()
+
+    try:
+        asyncio.run(_executar())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
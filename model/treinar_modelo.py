@@ -7,9 +7,12 @@ import numpy as np
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.neural_network import MLPClassifier
-from sklearn.linear_model import LinearRegression
 from sklearn.metrics import classification_report, accuracy_score, roc_auc_score
 
+from mlp_numpy import exportar_pesos
+from normalizacao import compilar_scalers, aplicar_normalizacao, salvar_normalizacao
+from engenharia_features import calcular_features_notas, calcular_slope_notas, calcular_std_notas, matriz_notas
+
 # ========================
 # 1. Carregar dados
 # ========================
@@ -20,18 +23,12 @@ data = pd.read_csv(r"../dataset/arquivo_unificado.csv")
 # ========================
 grade_cols = [col for col in data.columns if col.startswith("nota_disciplina")]
 
-def extrair_slope(row):
-    notas = row[grade_cols].dropna().values
-    if len(notas) < 2:
-        return 0
-    X = np.arange(len(notas)).reshape(-1, 1)
-    y = notas
-    model_lr = LinearRegression() # Renomeado para evitar conflito com 'model' global
-    model_lr.fit(X, y)
-    return model_lr.coef_[0]
+def extrair_slope(df):
+    # Mesmo cálculo usado na inferência (model/engenharia_features.py), vetorizado para todas as linhas
+    return calcular_slope_notas(matriz_notas(df, grade_cols))
 
-data["slope_notas"] = data.apply(extrair_slope, axis=1)
-data["std_notas"] = data[grade_cols].std(axis=1).fillna(0) # Calcula std_notas aqui
+data["slope_notas"] = extrair_slope(data)
+data["std_notas"] = calcular_std_notas(matriz_notas(data, grade_cols)) # Calcula std_notas aqui
 
 # ========================
 # 3. Seleção de features
@@ -46,9 +43,11 @@ y = data["evadiu"]
 # ========================
 scaler_dict = {}
 for col in features:
-    scaler = StandardScaler()
-    X[[col]] = scaler.fit_transform(X[[col]])
-    scaler_dict[col] = scaler # salva o scaler para cada coluna se quiser aplicar depois em novos dados
+    scaler_dict[col] = StandardScaler().fit(X[[col]]) # salva o scaler para cada coluna se quiser aplicar depois em novos dados
+
+# Aplicados de uma vez como transformação afim (mesma usada na inferência)
+media_features, escala_features = compilar_scalers(scaler_dict, features)
+X = pd.DataFrame(aplicar_normalizacao(X.to_numpy(dtype=float), media_features, escala_features), columns=features, index=X.index)
 
 # ========================
 # 5. Divisão treino/teste
@@ -143,35 +142,19 @@ def process_and_predict_evasion(new_student_data_list, trained_model, feature_li
     """
     new_students_df = pd.DataFrame(new_student_data_list)
 
-    # 1. Calcular slope_notas para os novos alunos
-    def extrair_slope_single_student(row):
-        notas = [row[col] for col in grade_columns if col in row and pd.notna(row[col])]
-        if len(notas) < 2:
-            return 0
-        X_new = np.arange(len(notas)).reshape(-1, 1)
-        y_new = np.array(notas)
-        model_lr = LinearRegression()
-        model_lr.fit(X_new, y_new)
-        return model_lr.coef_[0]
-
-    new_students_df["slope_notas"] = new_students_df.apply(extrair_slope_single_student, axis=1)
-
-    # 2. Calcular std_notas para os novos alunos
-    present_grade_cols_in_new_data = [col for col in grade_columns if col in new_students_df.columns]
-    if present_grade_cols_in_new_data:
-        new_students_df["std_notas"] = new_students_df[present_grade_cols_in_new_data].std(axis=1).fillna(0)
-    else:
-        new_students_df["std_notas"] = 0 # Default if no grade columns are present
+    # 1. e 2. Calcular slope_notas e std_notas para os novos alunos (mesmo módulo da inferência)
+    new_students_df["slope_notas"], new_students_df["std_notas"] = calcular_features_notas(new_students_df, grade_columns)
 
     # 3. Selecionar apenas as features que o modelo espera
     X_new_processed = new_students_df[feature_list].copy()
 
-    # 4. Aplicar a mesma normalização (usando os scalers pré-ajustados)
+    # 4. Aplicar a mesma normalização (usando os scalers pré-ajustados, fundidos em um único vetor)
     for col in feature_list:
-        if col in scalers_dict:
-            X_new_processed[[col]] = scalers_dict[col].transform(X_new_processed[[col]])
-        else:
+        if col not in scalers_dict:
             print(f"Aviso: Scaler não encontrado para a feature '{col}'. Pulando a normalização para esta feature.")
+    media, escala = compilar_scalers(scalers_dict, feature_list)
+    X_new_processed = pd.DataFrame(aplicar_normalizacao(X_new_processed.to_numpy(dtype=float), media, escala),
+                                   columns=feature_list, index=X_new_processed.index)
 
     # 5. Fazer as previsões
     y_prob_new = trained_model.predict_proba(X_new_processed)[:, 1]
@@ -191,7 +174,9 @@ def process_and_predict_evasion(new_student_data_list, trained_model, feature_li
 
 # Salvar os objetos necessários
 joblib.dump(model, "modelo_mlp.pkl")
+exportar_pesos(model, "modelo_mlp_pesos.npz") # Pesos em float32 para o motor NumPy usado na inferência
 joblib.dump(scaler_dict, "scalers.pkl")
+salvar_normalizacao(media_features, escala_features, features, "normalizacao.npz") # scalers.pkl compilado em média/escala
 joblib.dump((threshold_baixo_risco_percentil, threshold_medio_risco_percentil), "limiares_risco.pkl")
 joblib.dump(features, "features.pkl")
 joblib.dump(grade_cols, "grade_cols.pkl")
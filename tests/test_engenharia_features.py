@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from model.engenharia_features import calcular_features_notas, calcular_features_notas_aluno
+
+GRADE_COLS = [f"nota_disciplina{i}" for i in range(1, 11)]
+
+
+# ======================
+# Implementação anterior (aluno a aluno), como referência
+# ======================
+def slope_por_linha(df, grade_cols):
+    def calcular_slope(row):
+        notas = [row[col] for col in grade_cols if col in df.columns and pd.notna(row[col])]
+        if len(notas) < 2:
+            return 0
+        X = np.arange(len(notas)).reshape(-1, 1)
+        model_lr = LinearRegression()
+        model_lr.fit(X, np.array(notas))
+        return model_lr.coef_[0]
+    return df.apply(calcular_slope, axis=1).to_numpy(dtype=float)
+
+
+def std_por_linha(df, grade_cols):
+    notas_disponiveis = [col for col in grade_cols if col in df.columns]
+    return df[notas_disponiveis].std(axis=1).fillna(0).to_numpy(dtype=float)
+
+
+def _notas(n_alunos, semente=0, fracao_ausente=0.3):
+    rng = np.random.default_rng(semente)
+    notas = np.round(rng.uniform(0, 10, (n_alunos, len(GRADE_COLS))), 1)
+    notas[rng.random(notas.shape) < fracao_ausente] = np.nan
+    df = pd.DataFrame(notas, columns=GRADE_COLS)
+    # Linhas com 0, 1 e 2 notas, e com uma única nota ausente no meio
+    df.iloc[0] = np.nan
+    df.iloc[1] = np.nan
+    df.iloc[1, 4] = 7.5
+    df.iloc[2] = np.nan
+    df.iloc[2, [2, 8]] = [3.0, 9.0]
+    df.iloc[3] = np.arange(10, dtype=float)
+    df.iloc[3, 5] = np.nan
+    return df
+
+
+def _conferir(df, grade_cols):
+    slope, std = calcular_features_notas(df, grade_cols)
+    np.testing.assert_allclose(slope, slope_por_linha(df, grade_cols), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(std, std_por_linha(df, grade_cols), rtol=0, atol=1e-12)
+
+
+def test_equivale_ao_calculo_por_linha_com_notas_ausentes():
+    _conferir(_notas(300), GRADE_COLS)
+
+
+def test_linhas_com_zero_uma_e_duas_notas():
+    df = _notas(4)
+    slope, std = calcular_features_notas(df, GRADE_COLS)
+    assert slope[0] == 0 and std[0] == 0  # sem notas
+    assert slope[1] == 0 and std[1] == 0  # uma nota
+    assert slope[2] == pytest.approx(6.0) and std[2] == pytest.approx(np.std([3.0, 9.0], ddof=1))
+    _conferir(df, GRADE_COLS)
+
+
+@pytest.mark.parametrize("presentes", [GRADE_COLS[:3], GRADE_COLS[::2], [GRADE_COLS[7]], []])
+def test_grade_cols_parciais(presentes):
+    # Só parte das colunas de nota no arquivo: as demais são ignoradas, como antes
+    df = _notas(200, semente=1)[presentes]
+    _conferir(df, GRADE_COLS)
+
+
+def test_aluno_individual_igual_ao_lote():
+    df = _notas(100, semente=2)
+    slope, std = calcular_features_notas(df, GRADE_COLS)
+    for i, linha in enumerate(df.to_numpy()):
+        assert calcular_features_notas_aluno(list(linha)) == (slope[i], std[i])
@@ -0,0 +1,16 @@
+import pandas as pd
+
+from benchmarks.gerar_coorte import gerar_coorte
+from model.inferencia_modelo import prever_risco_evasao
+from model.pontuacao_paralela import pontuar_em_paralelo
+
+
+def test_paralelo_mantem_a_ordem_e_o_resultado_de_prever_risco_evasao():
+    # Linhas embaralhadas (índice fora de ordem) e várias partições por processo
+    df = gerar_coorte(2_500).sample(frac=1, random_state=7)
+
+    esperado = prever_risco_evasao(df)
+    obtido = pontuar_em_paralelo(df, n_processos=2, tamanho_particao=300)
+
+    assert obtido.index.equals(df.index)
+    pd.testing.assert_frame_equal(obtido, esperado)
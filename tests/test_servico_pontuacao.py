@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from model.registro_modelo import obter_artefatos
+from model.servico_pontuacao import iniciar_servico, pontuar_registros
+
+
+def _alunos():
+    grade_cols = obter_artefatos().grade_cols
+    return [
+        {"id_aluno": 1, "media_notas": 7, "frequencia": 80},  # como no exemplo do README: só algumas features
+        {"id_aluno": 2, "media_notas": 4, "frequencia": 70, "nota_disciplina1": 5, "nota_disciplina2": 7},
+        {"id_aluno": 3, "media_notas": 5, "frequencia": 60, "taxa_aprovacao": 0.5, **{col: 6 for col in grade_cols}},
+        {"id_aluno": 4, "total_semestres_cursados": 6, "qtd_trancamentos": 2, "media_notas": 3.1, "frequencia": 40},
+    ]
+
+
+def test_aluno_tem_o_mesmo_resultado_sozinho_e_em_lote_misto():
+    alunos = _alunos()
+    sozinhos = [pontuar_registros([aluno])[0] for aluno in alunos]
+    em_lote = pontuar_registros(alunos)
+
+    for esperado, obtido in zip(sozinhos, em_lote):
+        assert obtido["id_aluno"] == esperado["id_aluno"]
+        assert obtido["probabilidade"] is not None
+        assert obtido["probabilidade"] == pytest.approx(esperado["probabilidade"], abs=1e-6)
+        assert obtido["nivel_risco"] == esperado["nivel_risco"]
+        assert obtido["previsao_evasao"] == esperado["previsao_evasao"]
+
+
+def test_probabilidade_ausente_nao_vira_risco_alto():
+    resultado = pontuar_registros([{"id_aluno": 9, "media_notas": None}] + _alunos())[0]
+    assert resultado["probabilidade"] is None
+    assert resultado["nivel_risco"] is None
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-5", "1e3"])
+def test_content_length_invalido_responde_400(content_length):
+    async def enviar():
+        servidor = await iniciar_servico(porta=0)
+        porta = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+            escritor.write(f"POST /pontuar HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n{{}}".encode())
+            await escritor.drain()
+            resposta = await asyncio.wait_for(leitor.read(), timeout=5)
+            escritor.close()
+        return resposta
+
+    resposta = asyncio.run(enviar())
+    assert resposta.startswith(b"HTTP/1.1 400 ")
+    assert "requisição inválida".encode() in resposta
@@ -0,0 +1,95 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from utils.arquivos import remover_arquivo, temporario_ao_lado
+
+METRICAS = ["media_notas", "frequencia", "taxa_aprovacao"]
+COLUNAS_CONSOLIDADO = ["Semestre", "Total de Alunos", "Média das Notas", "Frequência Média (%)", "Taxa de Aprovação Média", "Probabilidade de Evasão"]
+
+# ======================
+# Agregados do painel do professor
+# ======================
+# Calculados uma vez quando a base é publicada e gravados ao lado dela
+# (<base>.agregados.json), identificados pela versão do arquivo da base.
+
+def calcular_agregados(df: pd.DataFrame) -> dict:
+    agregados = {"consolidado_semestre": None, "distribuicao_risco": {}, "media_geral": None}
+
+    # TAB 1 — resumo por semestre (mesma agregação de exibir_consolidados)
+    colunas_resumo = ["id_aluno", "media_notas", "frequencia", "taxa_aprovacao", "Probabilidade"]
+    if "semestre_atual" in df.columns and all(col in df.columns for col in colunas_resumo):
+        resumo = df.groupby("semestre_atual").agg({
+            "id_aluno": "count",
+            "media_notas": "mean",
+            "frequencia": "mean",
+            "taxa_aprovacao": "mean",
+            "Probabilidade": "mean"
+        }).reset_index()
+        resumo.columns = COLUNAS_CONSOLIDADO
+        agregados["consolidado_semestre"] = json.loads(resumo.to_json(orient="split", index=False, double_precision=15))
+
+    # TAB 3 — distribuição por nível de risco
+    if "Nível de Risco" in df.columns:
+        # Só níveis com alunos (numa coluna categórica value_counts também lista os vazios)
+        agregados["distribuicao_risco"] = {str(k): int(v) for k, v in df["Nível de Risco"].value_counts().items() if v}
+
+    # TAB 2 — média geral das métricas (mesma limpeza de exibir_dashboard)
+    if all(col in df.columns for col in METRICAS):
+        metricas = df[METRICAS].apply(pd.to_numeric, errors="coerce").dropna()
+        if not metricas.empty:
+            agregados["media_geral"] = {m: float(v) for m, v in metricas.mean().items()}
+
+    return agregados
+
+
+def versao_arquivo(caminho: str) -> str:
+    info = os.stat(caminho)
+    return f"{info.st_mtime_ns}-{info.st_size}"
+
+
+def caminho_agregados(caminho_base: str) -> str:
+    return os.path.splitext(caminho_base)[0] + ".agregados.json"
+
+
+def salvar_agregados(caminho_base: str, df: pd.DataFrame) -> dict:
+    agregados = calcular_agregados(df)
+    agregados["versao_base"] = versao_arquivo(caminho_base)
+    agregados["gerado_em"] = datetime.now().isoformat(timespec="seconds")
+
+    destino = caminho_agregados(caminho_base)
+    # Temporário único: duas sessões regravando agregados desatualizados ao mesmo tempo não colidem
+    temporario = temporario_ao_lado(destino)
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(agregados, f, ensure_ascii=False)
+        os.replace(temporario, destino)
+    except BaseException:
+        remover_arquivo(temporario)
+        raise
+    return agregados
+
+
+def carregar_agregados(caminho_base: str):
+    """Agregados gravados para a versão atual da base, ou None se não existirem ou estiverem desatualizados."""
+    destino = caminho_agregados(caminho_base)
+    if not os.path.exists(destino):
+        return None
+    with open(destino, encoding="utf-8") as f:
+        agregados = json.load(f)
+    if agregados.get("versao_base") != versao_arquivo(caminho_base):
+        return None
+    return agregados
+
+
+def obter_agregados(caminho_base: str, df: pd.DataFrame) -> dict:
+    """Agregados da versão atual da base; recalcula e grava a partir de df se estiverem ausentes ou desatualizados."""
+    return carregar_agregados(caminho_base) or salvar_agregados(caminho_base, df)
+
+
+def consolidado_como_dataframe(agregados: dict) -> pd.DataFrame:
+    if not agregados.get("consolidado_semestre"):
+        return pd.DataFrame(columns=COLUNAS_CONSOLIDADO)
+    return pd.DataFrame(**agregados["consolidado_semestre"])
@@ -0,0 +1,409 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+
+from utils.agregados_base import caminho_agregados, salvar_agregados
+from utils.arquivos import remover_arquivo, temporario_ao_lado
+from utils.cache_coortes import obter_coorte
+from utils.metricas import etapa
+
+EXTENSAO_COLUNAR = ".feather"
+CAMINHO_BASE_OFICIAL_CSV = "dataset/dataSetSintetico.csv"
+CAMINHO_BASE_OFICIAL = "dataset/dataSetSintetico.feather"  # formato anterior ao versionamento (só migração)
+DIRETORIO_VERSOES_OFICIAIS = "dataset/base_oficial"
+CAMINHO_PONTEIRO_OFICIAL = "dataset/base_oficial.json"
+VERSOES_MANTIDAS = 3
+DIRETORIO_SAIDAS_LOTE = "cache/lotes"
+IDADE_MAXIMA_SAIDA_LOTE = 24 * 60 * 60  # segundos
+
+# Colunas usadas pelo painel do professor e pelos relatórios
+COLUNAS_PROFESSOR = [
+    "id_aluno", "nome_aluno", "semestre_atual", "media_notas", "frequencia", "taxa_aprovacao",
+    "Probabilidade", "Nível de Risco", "Situação Sugerida",
+]
+
+# ======================
+# Tipos explícitos
+# ======================
+COLUNAS_INTEIRAS = [
+    "id_aluno", "semestre_atual", "total_semestres_cursados", "qtd_trancamentos", "evadiu", "Previsão Evasão (0/1)",
+]
+COLUNAS_REAIS = ["media_notas", "frequencia", "taxa_aprovacao", "slope_notas", "std_notas", "Probabilidade"]
+COLUNAS_TEXTO = ["nome_aluno", "Nível de Risco", "Situação Sugerida"]
+NIVEIS_RISCO = ["🟢 Baixo", "🟠 Médio", "🔴 Alto"]  # mesma ordem de classificar_riscos
+# Texto com poucos valores distintos: categorias (códigos int8) na representação em memória
+COLUNAS_CATEGORICAS = {"Nível de Risco": NIVEIS_RISCO, "Situação Sugerida": None}
+
+
+def _tipo_arrow(col):
+    if col in COLUNAS_TEXTO:
+        return pa.string()
+    if col in COLUNAS_INTEIRAS:
+        return pa.int64()
+    if col.startswith("nota_disciplina") or col in COLUNAS_REAIS:
+        return pa.float64()
+    return None
+
+
+class ErroValoresInvalidos(ValueError):
+    """Valores não numéricos em colunas numéricas: a base não é gravada (nenhum valor vira vazio em silêncio)."""
+
+    def __init__(self, mensagem: str, invalidos: dict = None):
+        super().__init__(mensagem)
+        self.invalidos = invalidos or {}  # {coluna: Series com os valores originais}
+
+
+def _numerico(valores: pd.Series, col: str, invalidos: dict) -> pd.Series:
+    """Converte para número; valores preenchidos que não são números vão para invalidos[col]."""
+    if pd.api.types.is_numeric_dtype(valores):
+        return valores
+    convertidos = pd.to_numeric(valores, errors="coerce")
+    texto = valores.astype("string").str.strip()
+    ruins = valores[convertidos.isna() & texto.notna() & (texto != "")]
+    if len(ruins):
+        invalidos[col] = ruins
+    return convertidos
+
+
+def normalizar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas conhecidas para tipos fixos (inteiros, float64 e texto) antes de gravar.
+
+    Raises:
+        ErroValoresInvalidos: se alguma coluna numérica tiver valores que não são números (ex.: "7,5" ou "abc").
+    """
+    df = df.copy()
+    invalidos = {}
+    for col in df.columns:
+        if col in COLUNAS_TEXTO:
+            df[col] = df[col].astype("string")
+        elif col in COLUNAS_INTEIRAS:
+            valores = _numerico(df[col], col, invalidos)
+            # Inteiros com valores ausentes ficam em float64 (mesmo comportamento do read_csv)
+            df[col] = valores.astype("int64") if valores.notna().all() else valores.astype("float64")
+        elif col.startswith("nota_disciplina") or col in COLUNAS_REAIS:
+            valores = _numerico(df[col], col, invalidos)
+            # float32 (coorte compacta) é gravado como está: convertê-lo para float64 só acrescentaria ruído (7.36 -> 7.360000133...)
+            df[col] = valores if valores.dtype == "float32" else valores.astype("float64")
+    if invalidos:
+        detalhes = "; ".join(
+            f"{col}: {len(ruins)} valor(es), ex.: {', '.join(repr(v) for v in ruins.head(3))}" for col, ruins in invalidos.items()
+        )
+        raise ErroValoresInvalidos(f"Valores não numéricos em colunas numéricas ({detalhes}).", invalidos)
+    return df
+
+# ======================
+# Representação compacta em memória
+# ======================
+# Coortes pontuadas mantidas em memória (cache de coortes, painéis) usam tipos estreitos:
+# nível de risco e situação como categorias, notas, métricas e probabilidades em float32
+# (o modelo já calcula a probabilidade em float32) e contagens/ids (e métricas que chegam
+# como inteiros) no menor inteiro que os comporta. As colunas float32 ficam num único bloco contíguo do DataFrame.
+
+def _coluna_compacta(col, valores: pd.Series) -> pd.Series:
+    if col in COLUNAS_CATEGORICAS:
+        categorias = COLUNAS_CATEGORICAS[col]
+        if categorias is not None and valores.dropna().isin(categorias).all():
+            return valores.astype(pd.CategoricalDtype(categorias, ordered=True))
+        return valores.astype("category")
+    if col in COLUNAS_INTEIRAS:
+        valores = pd.to_numeric(valores, errors="coerce")
+        # Inteiros com valores ausentes ficam em float32 (como em normalizar_tipos)
+        return valores.astype("float32") if valores.isna().any() else pd.to_numeric(valores, downcast="integer")
+    if col.startswith("nota_disciplina") or col in COLUNAS_REAIS:
+        valores = pd.to_numeric(valores, errors="coerce")
+        if pd.api.types.is_integer_dtype(valores):  # ex.: frequencia enviada como inteiro continua inteira
+            return pd.to_numeric(valores, downcast="integer")
+        return valores.astype("float32")
+    return valores
+
+
+def compactar_coorte(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas conhecidas de uma coorte para a representação compacta (ver acima).
+
+    Colunas desconhecidas ficam como estão. Ordem das colunas e índice são mantidos.
+    """
+    with etapa("coorte.compactacao", len(df)):
+        # Montado a partir de um dicionário: o pandas junta as colunas de mesmo tipo em um bloco só
+        return pd.DataFrame({col: _coluna_compacta(col, df[col]) for col in df.columns}, index=df.index)
+
+# ======================
+# Gravação e leitura
+# ======================
+def caminho_colunar(caminho: str) -> str:
+    return os.path.splitext(caminho)[0] + EXTENSAO_COLUNAR
+
+
+def salvar_base(df: pd.DataFrame, caminho: str) -> str:
+    """
+    Grava a base em Feather (Arrow IPC) sem compressão, para permitir leitura por memory map.
+
+    Raises:
+        ErroValoresInvalidos: ver normalizar_tipos (nada é gravado).
+    """
+    caminho = caminho_colunar(caminho)
+    df = normalizar_tipos(df)
+    temporario = temporario_ao_lado(caminho)
+    try:
+        feather.write_feather(df, temporario, compression="uncompressed")
+        os.replace(temporario, caminho)
+    except BaseException:
+        remover_arquivo(temporario)
+        raise
+    return caminho
+
+
+def converter_csv(caminho_csv: str, destino: str = None) -> str:
+    """
+    Converte um CSV para Feather em blocos (memória limitada), sem carregá-lo inteiro no pandas.
+
+    Raises:
+        ErroValoresInvalidos: se um valor não puder ser convertido para o tipo da coluna (nada é gravado).
+    """
+    destino = caminho_colunar(destino or caminho_csv)
+    with open(caminho_csv, encoding="utf-8") as f:
+        cabecalho = next(csv.reader(f), [])
+    tipos = {col: _tipo_arrow(col) for col in cabecalho if _tipo_arrow(col) is not None}
+
+    temporario = temporario_ao_lado(destino)
+    try:
+        leitor = pacsv.open_csv(caminho_csv, convert_options=pacsv.ConvertOptions(column_types=tipos))
+        with pa.ipc.new_file(temporario, leitor.schema) as escritor:
+            for lote in leitor:
+                escritor.write_batch(lote)
+        os.replace(temporario, destino)
+    except pa.ArrowInvalid as erro:
+        remover_arquivo(temporario)
+        raise ErroValoresInvalidos(f"CSV com valores inválidos para o tipo da coluna: {erro}") from erro
+    except BaseException:
+        remover_arquivo(temporario)
+        raise
+    return destino
+
+
+def ler_base(caminho: str, colunas=None) -> pd.DataFrame:
+    """
+    Lê uma base salva, carregando só as colunas pedidas (as ausentes no arquivo são ignoradas).
+
+    Arquivos Feather são lidos por memory map; CSV continua aceito para bases antigas.
+    """
+    if caminho.endswith(EXTENSAO_COLUNAR):
+        if colunas is not None:
+            with pa.memory_map(caminho) as origem:
+                existentes = set(pa.ipc.open_file(origem).schema.names)
+            colunas = [col for col in colunas if col in existentes]
+        return feather.read_table(caminho, columns=colunas, memory_map=True).to_pandas()
+
+    usecols = (lambda col: col in colunas) if colunas is not None else None
+    return pd.read_csv(caminho, usecols=usecols)
+
+
+def contar_linhas(caminho: str) -> int:
+    """Total de linhas lido dos metadados do Feather (sem carregar os dados)."""
+    if caminho.endswith(EXTENSAO_COLUNAR):
+        with pa.memory_map(caminho) as origem:
+            leitor = pa.ipc.open_file(origem)
+            return sum(leitor.get_batch(i).num_rows for i in range(leitor.num_record_batches))
+    return len(pd.read_csv(caminho, usecols=[0]))
+
+
+def ler_previa(caminho: str, n: int = 10) -> pd.DataFrame:
+    """Primeiras n linhas, sem ler o arquivo inteiro."""
+    if caminho.endswith(EXTENSAO_COLUNAR):
+        with pa.memory_map(caminho) as origem:
+            leitor = pa.ipc.open_file(origem)
+            if leitor.num_record_batches == 0:
+                return leitor.schema.empty_table().to_pandas()
+            return pa.Table.from_batches([leitor.get_batch(0).slice(0, n)]).to_pandas()
+    return pd.read_csv(caminho, nrows=n)
+
+
+def exportar_csv(caminho: str) -> bytes:
+    return ler_base(caminho).to_csv(index=False).encode("utf-8")
+
+# ======================
+# Base oficial do painel do professor
+# ======================
+# Cada publicação grava um snapshot novo e imutável (base_<versão>.feather e seus
+# agregados) e só depois troca o ponteiro base_oficial.json com os.replace.
+# Quem lê o ponteiro sempre encontra uma versão completa, nunca um arquivo pela
+# metade, e pode reaproveitar o DataFrame já carregado enquanto a versão não mudar.
+_ponteiro_lido = (None, None)  # (assinatura do arquivo do ponteiro, conteúdo)
+_trava_migracao = threading.Lock()
+
+
+def _assinatura(caminho: str):
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return info.st_ino, info.st_mtime_ns, info.st_size  # os.replace troca o inode: nova publicação nunca passa despercebida
+
+
+def base_oficial_atual():
+    """
+    Versão publicada da base oficial, lida do ponteiro (None se ainda não houver publicação).
+
+    Custa um os.stat enquanto o ponteiro não muda; o JSON só é relido após uma nova publicação.
+
+    Returns:
+        dict com versao, caminho, linhas e publicado_em.
+    """
+    global _ponteiro_lido
+    assinatura = _assinatura(CAMINHO_PONTEIRO_OFICIAL)
+    if assinatura is None:
+        return None
+    lida, ponteiro = _ponteiro_lido
+    if lida != assinatura:
+        with open(CAMINHO_PONTEIRO_OFICIAL, encoding="utf-8") as f:
+            ponteiro = json.load(f)
+        _ponteiro_lido = (assinatura, ponteiro)
+    return ponteiro
+
+
+def _origem_legada():
+    """
+    Base no formato antigo (CSV ou Feather gravado no lugar) a migrar, só enquanto não houver versão publicada.
+
+    Depois da primeira publicação os arquivos antigos são ignorados: o CSV é versionado no git, e um
+    pull ou checkout que mude sua data não pode substituir a base publicada pelo coordenador.
+    """
+    if os.path.exists(CAMINHO_PONTEIRO_OFICIAL):
+        return None
+    candidatos = [c for c in (CAMINHO_BASE_OFICIAL, CAMINHO_BASE_OFICIAL_CSV) if os.path.exists(c)]
+    if not candidatos:
+        return None
+    return max(candidatos, key=os.path.getmtime)
+
+
+def caminho_base_oficial():
+    """Caminho do snapshot da versão oficial atual, migrando a base antiga na primeira leitura (None se não houver base)."""
+    origem = _origem_legada()
+    if origem is not None:
+        with _trava_migracao:
+            origem = _origem_legada()  # outra sessão pode ter migrado enquanto esperávamos
+            if origem is not None:
+                publicar_base_oficial(ler_base(origem))
+    ponteiro = base_oficial_atual()
+    return ponteiro["caminho"] if ponteiro else None
+
+
+def ler_base_oficial(colunas=None, tentativas: int = 3):
+    """
+    Lê a versão oficial atual pelo cache de coortes do processo (uma cópia por versão, não por sessão).
+
+    Se o snapshot sumir entre a leitura do ponteiro e a abertura do arquivo (publicações
+    seguidas o tiram da retenção), o ponteiro é relido e a versão mais nova é usada.
+
+    Returns:
+        (ponteiro, cópia rasa copy-on-write do DataFrame compacto), ou (None, None) se não houver base oficial.
+    """
+    for tentativa in range(tentativas):
+        if caminho_base_oficial() is None:
+            return None, None
+        ponteiro = base_oficial_atual()
+        chave = ("base_oficial", ponteiro["versao"], tuple(colunas) if colunas is not None else None)
+        try:
+            return ponteiro, obter_coorte(chave, lambda: compactar_coorte(ler_base(ponteiro["caminho"], colunas)))
+        except FileNotFoundError:
+            if tentativa == tentativas - 1:
+                raise
+
+
+def publicar_base_oficial(df: pd.DataFrame) -> str:
+    """
+    Publica df como nova versão da base oficial.
+
+    O snapshot e os agregados são gravados antes da troca do ponteiro, então leitores
+    concorrentes continuam na versão anterior até a nova estar completa.
+
+    Returns:
+        caminho do snapshot publicado.
+    """
+    versao = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:6]}"  # ordem alfabética = ordem de publicação
+    os.makedirs(DIRETORIO_VERSOES_OFICIAIS, exist_ok=True)
+    caminho = salvar_base(df, os.path.join(DIRETORIO_VERSOES_OFICIAIS, f"base_{versao}{EXTENSAO_COLUNAR}"))
+    salvar_agregados(caminho, df)
+
+    ponteiro = {
+        "versao": versao,
+        "caminho": caminho,
+        "linhas": len(df),
+        "publicado_em": datetime.now().isoformat(timespec="seconds"),
+    }
+    temporario = f"{CAMINHO_PONTEIRO_OFICIAL}.{versao}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(ponteiro, f, ensure_ascii=False)
+    os.replace(temporario, CAMINHO_PONTEIRO_OFICIAL)
+
+    remover_versoes_antigas()
+    return caminho
+
+
+def remover_versoes_antigas(manter: int = VERSOES_MANTIDAS):
+    """Apaga snapshots antigos, mantendo os `manter` mais recentes e sempre a versão atual."""
+    ponteiro = base_oficial_atual()
+    atual = os.path.basename(ponteiro["caminho"]) if ponteiro else None
+    versoes = sorted(
+        (nome for nome in os.listdir(DIRETORIO_VERSOES_OFICIAIS)
+         if nome.startswith("base_") and nome.endswith(EXTENSAO_COLUNAR)),
+        reverse=True,
+    )
+    for nome in versoes[manter:]:
+        if nome == atual:
+            continue
+        caminho = os.path.join(DIRETORIO_VERSOES_OFICIAIS, nome)
+        for arquivo in (caminho, caminho_agregados(caminho)):
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass  # ainda aberto por um leitor (Windows) ou já removido: fica para a próxima publicação
+
+# ======================
+# Saídas temporárias de uploads grandes
+# ======================
+class SaidaLote:
+    """
+    CSV pontuado de um upload grande, em DIRETORIO_SAIDAS_LOTE.
+
+    O arquivo é apagado por remover(), quando o objeto é coletado (ex.: a sessão do Streamlit
+    termina e o session_state é descartado) ou na saída do processo. Sobras de um processo
+    interrompido são apagadas na criação da próxima saída, depois de IDADE_MAXIMA_SAIDA_LOTE.
+    """
+
+    def __init__(self):
+        os.makedirs(DIRETORIO_SAIDAS_LOTE, exist_ok=True)
+        remover_saidas_antigas()
+        descritor, self.caminho = tempfile.mkstemp(suffix=".csv", dir=DIRETORIO_SAIDAS_LOTE)
+        os.close(descritor)
+        self._finalizador = weakref.finalize(self, remover_arquivo, self.caminho)
+
+    def remover(self):
+        self._finalizador()
+
+
+def remover_saidas_antigas(idade_maxima: float = IDADE_MAXIMA_SAIDA_LOTE):
+    limite = time.time() - idade_maxima
+    for entrada in os.scandir(DIRETORIO_SAIDAS_LOTE):
+        if entrada.is_file() and entrada.stat().st_mtime < limite:
+            remover_arquivo(entrada.path)
+
+
+if __name__ == "__main__":
+    # Converte CSVs salvos para Feather: python -m utils.armazenamento_bases dataset/base_x.csv ...
+    import sys
+
+    for arquivo in sys.argv[1:]:
+        print(f"{arquivo} -> {converter_csv(arquivo)}")
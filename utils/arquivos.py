@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+# ======================
+# Gravação segura de arquivos
+# ======================
+# Gravações vão para um temporário de nome único ao lado do destino e entram no lugar com
+# os.replace: leitores nunca veem um arquivo pela metade e gravações simultâneas do mesmo
+# destino (sessões, threads ou processos diferentes) não disputam o mesmo temporário.
+
+def remover_arquivo(caminho: str):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+
+
+def temporario_ao_lado(caminho: str) -> str:
+    """Arquivo temporário de nome único no diretório de caminho (duas gravações simultâneas não se misturam)."""
+    pasta, nome = os.path.split(caminho)
+    descritor, temporario = tempfile.mkstemp(prefix=f"{nome}.", suffix=".tmp", dir=pasta or ".")
+    os.close(descritor)
+    return temporario
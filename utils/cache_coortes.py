@@ -0,0 +1,124 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+from utils.metricas import contar, etapa
+
+LIMITE_MEMORIA_PADRAO = int(os.environ.get("EVASAO_CACHE_COORTES_MB", "1024")) * 1024 * 1024
+
+# ======================
+# Cache de coortes compartilhado entre sessões
+# ======================
+# Uma cópia de cada coorte (base oficial de uma versão, upload pontuado) por processo,
+# em vez de uma por sessão do Streamlit. Cada sessão recebe uma cópia rasa (independente
+# graças ao copy-on-write, sempre ligado no pandas 3, exigido em requirements.txt): os dados são
+# os mesmos, e uma tela que altere o DataFrame (filtros, colunas novas, dropna) só copia
+# as colunas alteradas, sem afetar o cache nem as outras sessões. Quando a soma das
+# coortes passa do limite de memória, as menos usadas recentemente são descartadas.
+# Estruturas derivadas de uma coorte que não são DataFrames (ex.: utils/indice_risco.py)
+# também podem ser guardadas: precisam informar nbytes e são tratadas como somente leitura.
+
+class CacheCoortes:
+    def __init__(self, limite_bytes=LIMITE_MEMORIA_PADRAO):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self._entradas = OrderedDict()  # chave -> (valor, bytes), da menos para a mais recente
+        self._carregando = {}           # chave -> Future: sessões simultâneas esperam uma única carga
+        self._trava = threading.Lock()
+
+    def obter(self, chave, carregar) -> pd.DataFrame:
+        """
+        Coorte da chave, carregada com carregar() só se ainda não estiver no cache.
+
+        Args:
+            chave: identifica a coorte e sua versão (ex.: ("base_oficial", versao)).
+            carregar: função sem argumentos que devolve o DataFrame (ou outro objeto com nbytes).
+
+        Returns:
+            cópia rasa (copy-on-write) do DataFrame em cache; outros objetos são devolvidos como estão.
+        """
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                contar("cache_coortes.acertos")
+                return _copia(entrada[0])
+            futuro = self._carregando.get(chave)
+            dono = futuro is None
+            if dono:
+                futuro = self._carregando[chave] = Future()
+                self.falhas += 1
+                contar("cache_coortes.falhas")
+
+        if not dono:
+            return _copia(futuro.result())
+
+        try:
+            with etapa("cache_coortes.carga") as medicao:
+                df = carregar()
+                medicao.linhas = len(df)
+            self._guardar(chave, df)
+            futuro.set_result(df)
+        except BaseException as erro:
+            futuro.set_exception(erro)
+            raise
+        finally:
+            with self._trava:
+                del self._carregando[chave]
+        return _copia(df)
+
+    def _guardar(self, chave, df):
+        tamanho = _tamanho(df)
+        with self._trava:
+            if chave in self._entradas:
+                self.bytes -= self._entradas.pop(chave)[1]
+            if tamanho > self.limite_bytes:
+                return  # maior que o cache inteiro: usada por quem pediu, mas não guardada
+            self._entradas[chave] = (df, tamanho)
+            self.bytes += tamanho
+            while self.bytes > self.limite_bytes:
+                _, (_, liberados) = self._entradas.popitem(last=False)
+                self.bytes -= liberados
+                self.despejos += 1
+                contar("cache_coortes.despejos")
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            return {
+                "coortes": len(self._entradas),
+                "mb": round(self.bytes / 1024 ** 2, 1),
+                "limite_mb": round(self.limite_bytes / 1024 ** 2, 1),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "despejos": self.despejos,
+            }
+
+
+def _copia(valor):
+    return valor.copy(deep=False) if isinstance(valor, pd.DataFrame) else valor
+
+
+def _tamanho(valor) -> int:
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    return int(valor.nbytes)
+
+
+cache_coortes = CacheCoortes()
+
+
+def obter_coorte(chave, carregar) -> pd.DataFrame:
+    """Atalho para o cache do processo (ver CacheCoortes.obter)."""
+    return cache_coortes.obter(chave, carregar)
@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_RELATORIOS = 32
+
+# ======================
+# Geração de relatórios fora da renderização
+# ======================
+# Um único worker por processo: reportlab/matplotlib não rodam mais durante a
+# renderização das páginas, e PDFs iguais (mesma chave) são gerados só uma vez
+# e compartilhados entre sessões.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="relatorios")
+_relatorios = OrderedDict()  # chave -> Future com os bytes do PDF
+_trava = threading.Lock()
+
+
+def _gerar_bytes(gerar, args, kwargs):
+    resultado = gerar(*args, **kwargs)
+    return resultado.getvalue() if hasattr(resultado, "getvalue") else resultado
+
+
+def solicitar_relatorio(chave, gerar, *args, **kwargs):
+    """Agenda gerar(*args, **kwargs) no worker, a menos que a chave já esteja pronta ou em andamento. Retorna o Future."""
+    with _trava:
+        futuro = _relatorios.get(chave)
+        if futuro is not None and not (futuro.done() and futuro.exception() is not None):
+            _relatorios.move_to_end(chave)
+            return futuro
+
+        futuro = _executor.submit(_gerar_bytes, gerar, args, kwargs)
+        _relatorios[chave] = futuro
+        while len(_relatorios) > MAX_RELATORIOS:
+            _relatorios.popitem(last=False)
+        return futuro
+
+
+def consultar_relatorio(chave):
+    """Future do relatório (pronto ou em andamento), ou None se ainda não foi pedido."""
+    with _trava:
+        futuro = _relatorios.get(chave)
+        if futuro is not None:
+            _relatorios.move_to_end(chave)
+        return futuro
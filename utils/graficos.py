@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils.metricas import medido
+
+# ======================
+# Gráficos com muitos alunos
+# ======================
+# Até LIMITE_PONTOS os gráficos recebem todos os alunos (comportamento original).
+# Acima disso a dispersão usa WebGL com amostra estratificada e, acima de
+# LIMITE_DENSIDADE, vira um mapa de densidade calculado aqui no servidor.
+# Em ambos os casos os alunos de maior risco continuam desenhados um a um.
+LIMITE_PONTOS = 5_000
+LIMITE_DENSIDADE = 100_000
+MAX_DESTAQUES = 500
+BINS_DENSIDADE = 60
+
+
+def posicoes_maior_risco(valores, k=MAX_DESTAQUES) -> np.ndarray:
+    """Posições das k linhas com maior valor (ex.: Probabilidade), sem ordenar a coluna inteira."""
+    valores = np.nan_to_num(np.asarray(valores, dtype=float), nan=-np.inf)
+    k = min(k, len(valores))
+    if k == 0:
+        return np.array([], dtype=int)
+    return np.sort(np.argpartition(-valores, k - 1)[:k])
+
+
+def amostra_estratificada(df, n, estrato=None, destacar="Probabilidade", max_destaques=MAX_DESTAQUES, semente=0):
+    """
+    Reduz df a cerca de n linhas: os max_destaques alunos de maior risco entram sempre,
+    o restante é sorteado proporcionalmente dentro de cada estrato (ex.: Nível de Risco).
+    """
+    if len(df) <= n:
+        return df
+
+    destaques = np.array([], dtype=int)
+    if destacar in df.columns:
+        destaques = posicoes_maior_risco(df[destacar], min(max_destaques, n))
+    mascara = np.ones(len(df), dtype=bool)
+    mascara[destaques] = False
+    resto = df.iloc[mascara]
+
+    fracao = (n - len(destaques)) / len(resto)
+    if estrato is not None and estrato in resto.columns:
+        amostra = resto.groupby(estrato, group_keys=False, observed=True).sample(frac=fracao, random_state=semente)
+    else:
+        amostra = resto.sample(frac=fracao, random_state=semente)
+    return pd.concat([df.iloc[destaques], amostra])
+
+
+def mapa_densidade(df, x, y, bins=BINS_DENSIDADE) -> go.Figure:
+    """Histograma 2D calculado no servidor: o navegador recebe bins x bins contagens, não os alunos."""
+    pontos = df[[x, y]].apply(pd.to_numeric, errors="coerce").dropna()
+    contagens, bordas_x, bordas_y = np.histogram2d(pontos[x], pontos[y], bins=bins)
+    contagens = np.where(contagens > 0, contagens, np.nan)
+
+    fig = go.Figure(go.Heatmap(
+        x=(bordas_x[:-1] + bordas_x[1:]) / 2,
+        y=(bordas_y[:-1] + bordas_y[1:]) / 2,
+        z=contagens.T,
+        colorscale="Blues",
+        colorbar=dict(title="Alunos"),
+        hovertemplate=f"{x}: %{{x:.2f}}<br>{y}: %{{y:.2f}}<br>Alunos: %{{z}}<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+@medido("graficos.dispersao")
+def dispersao(df, x, y, estrato="Nível de Risco", max_pontos=LIMITE_PONTOS, limite_densidade=LIMITE_DENSIDADE, **kwargs):
+    """px.scatter que se adapta ao tamanho da base (mesmos argumentos de px.scatter)."""
+    total = len(df)
+    if total <= max_pontos:
+        return px.scatter(df, x=x, y=y, **kwargs)
+
+    titulo = kwargs.pop("title", None) or ""
+    if total > limite_densidade:
+        fig = mapa_densidade(df, x, y)
+        destaques = df.iloc[posicoes_maior_risco(df[y])] if y == "Probabilidade" else df.iloc[:0]
+        if not destaques.empty:
+            hover = destaques["id_aluno"].astype(str) if "id_aluno" in destaques.columns else None
+            fig.add_trace(go.Scattergl(
+                x=destaques[x], y=destaques[y], mode="markers", name="Maior risco",
+                marker=dict(color="red", size=5), hovertext=hover,
+            ))
+        fig.update_layout(title=f"{titulo} (densidade de {total} alunos)".strip())
+        return fig
+
+    amostra = amostra_estratificada(df, max_pontos, estrato=estrato)
+    return px.scatter(
+        amostra, x=x, y=y, render_mode="webgl",
+        title=f"{titulo} (amostra de {len(amostra)} de {total} alunos)".strip(), **kwargs
+    )
+
+
+@medido("graficos.histograma")
+def histograma(df, x, nbins=None, max_pontos=LIMITE_PONTOS, **kwargs):
+    """px.histogram que, acima de max_pontos, envia só as contagens já agregadas (mesmos argumentos de px.histogram)."""
+    if len(df) <= max_pontos:
+        return px.histogram(df, x=x, nbins=nbins, **kwargs)
+
+    # Rug marginal desenharia um traço por aluno: omitido em bases grandes
+    kwargs.pop("marginal", None)
+    if not pd.api.types.is_numeric_dtype(df[x]):
+        contagem = df[x].value_counts().rename_axis(x).reset_index(name="count")
+        contagem = contagem[contagem["count"] > 0]  # categorias sem alunos
+        return px.bar(contagem, x=x, y="count", **kwargs)
+
+    valores = df[x].dropna().to_numpy(dtype=float)
+    contagens, bordas = np.histogram(valores, bins=nbins or 20)
+    fig = go.Figure(go.Bar(x=(bordas[:-1] + bordas[1:]) / 2, y=contagens, width=np.diff(bordas), name=x))
+    fig.update_layout(xaxis_title=x, yaxis_title="count", bargap=0, title=kwargs.get("title"))
+    return fig
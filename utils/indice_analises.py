@@ -0,0 +1,85 @@
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from utils.armazenamento_bases import contar_linhas, ler_base, ler_previa
+
+CAMINHO_INDICE = "dataset/indice_analises.jsonl"
+PADRAO_BASES = ["dataset/base_*.feather", "dataset/base_*.csv"]
+LINHAS_PREVIA = 10
+
+# ======================
+# Manifesto de cada análise salva
+# ======================
+# Uma linha JSON por base salva, gravada no momento do salvamento. O histórico lê só
+# este arquivo; a base completa só é carregada quando o coordenador pede.
+
+def checksum(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def registrar_analise(caminho: str, df: pd.DataFrame = None, versao_modelo: str = None) -> dict:
+    """
+    Acrescenta ao índice o manifesto da base salva em caminho.
+
+    Se o DataFrame salvo for informado, contagens e prévia vêm dele; senão são lidas do arquivo.
+    """
+    if df is not None:
+        linhas = len(df)
+        riscos = df["Nível de Risco"] if "Nível de Risco" in df.columns else None
+        previa = df.head(LINHAS_PREVIA)
+    else:
+        linhas = contar_linhas(caminho)
+        riscos = ler_base(caminho, ["Nível de Risco"]).get("Nível de Risco")
+        previa = ler_previa(caminho, LINHAS_PREVIA)
+
+    manifesto = {
+        "arquivo": caminho,
+        "nome": os.path.basename(caminho),
+        "salvo_em": datetime.fromtimestamp(os.path.getmtime(caminho)).isoformat(timespec="seconds"),
+        "linhas": int(linhas),
+        "distribuicao_risco": {str(k): int(v) for k, v in riscos.value_counts().items() if v} if riscos is not None else {},
+        "versao_modelo": versao_modelo,
+        "previa": json.loads(previa.to_json(orient="split", index=False)),
+        "sha256": checksum(caminho),
+    }
+
+    pasta = os.path.dirname(CAMINHO_INDICE)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    # Uma única escrita em modo append por manifesto: salvamentos simultâneos não se sobrescrevem
+    with open(CAMINHO_INDICE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(manifesto, ensure_ascii=False) + "\n")
+    return manifesto
+
+
+def listar_analises() -> list:
+    """Manifestos das bases existentes, da mais recente para a mais antiga (bases antigas são indexadas na primeira vez)."""
+    manifestos = {}
+    if os.path.exists(CAMINHO_INDICE):
+        with open(CAMINHO_INDICE, encoding="utf-8") as f:
+            for linha in f:
+                if linha.strip():
+                    manifesto = json.loads(linha)
+                    manifestos[manifesto["arquivo"]] = manifesto  # o registro mais recente prevalece
+
+    arquivos = [arq.replace(os.sep, "/") for padrao in PADRAO_BASES for arq in glob.glob(padrao)]
+    for arq in arquivos:
+        if arq not in manifestos:
+            manifestos[arq] = registrar_analise(arq)
+
+    arquivos = set(arquivos)
+    existentes = [m for arq, m in manifestos.items() if arq in arquivos]
+    return sorted(existentes, key=lambda m: m["nome"], reverse=True)
+
+
+def previa_como_dataframe(manifesto: dict) -> pd.DataFrame:
+    return pd.DataFrame(**manifesto["previa"])
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from utils.cache_coortes import obter_coorte
+from utils.metricas import etapa
+
+# ======================
+# Índice de consultas de risco
+# ======================
+# Montado uma vez por coorte pontuada (upload ou versão da base oficial) e guardado no cache
+# de coortes: as posições das linhas ordenadas pela Probabilidade (maior primeiro) e as
+# posições de cada Nível de Risco e de cada semestre. Filtros por nível, limiares de
+# probabilidade e "top k" viram fatias desses vetores, sem varrer o DataFrame a cada rerun.
+# As posições valem para o DataFrame a partir do qual o índice foi montado (ou cópias dele).
+
+class IndiceRisco:
+    def __init__(self, df: pd.DataFrame, coluna_prob="Probabilidade", coluna_nivel="Nível de Risco",
+                 coluna_semestre="semestre_atual"):
+        self.linhas = len(df)
+        tipo_posicao = np.int32 if self.linhas < 2 ** 31 else np.int64
+
+        prob = df[coluna_prob].to_numpy()
+        if prob.dtype.kind != "f":
+            prob = prob.astype("float64")
+        # Ordem decrescente estável (empates na ordem das linhas); NaN fica no fim
+        self._ordem = np.argsort(-prob, kind="stable").astype(tipo_posicao)
+        self._chaves = -prob[self._ordem]  # crescente: usado com searchsorted nos limiares
+
+        # Por nível: posições também em ordem decrescente de probabilidade
+        self._por_nivel = {}
+        if coluna_nivel in df.columns:
+            codigos, rotulos = pd.factorize(df[coluna_nivel])
+            for rotulo, posicoes in zip(rotulos, _particionar(codigos[self._ordem], self._ordem, len(rotulos))):
+                self._por_nivel[rotulo] = (posicoes, -prob[posicoes])
+
+        # Por semestre: posições na ordem das linhas
+        self._por_semestre = {}
+        if coluna_semestre in df.columns:
+            codigos, semestres = pd.factorize(df[coluna_semestre])
+            linhas = np.arange(self.linhas, dtype=tipo_posicao)
+            self._por_semestre = dict(zip(semestres.tolist(), _particionar(codigos, linhas, len(semestres))))
+
+    def __len__(self):
+        return self.linhas
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos vetores do índice (usada no limite do cache de coortes)."""
+        vetores = [self._ordem, self._chaves]
+        vetores += [vetor for par in self._por_nivel.values() for vetor in par]
+        vetores += list(self._por_semestre.values())
+        return sum(vetor.nbytes for vetor in vetores)
+
+    @property
+    def niveis(self) -> dict:
+        """{nível: quantidade de alunos}."""
+        return {nivel: len(posicoes) for nivel, (posicoes, _) in self._por_nivel.items()}
+
+    @property
+    def semestres(self) -> list:
+        return sorted(self._por_semestre)
+
+    def _candidatos(self, nivel, acima_de):
+        if nivel is None:
+            posicoes, chaves = self._ordem, self._chaves
+        else:
+            posicoes, chaves = self._por_nivel.get(nivel, (self._ordem[:0], self._chaves[:0]))
+        if acima_de is not None:
+            # Probabilidade > acima_de  <=>  -Probabilidade < -acima_de (comparação no tipo da coluna, como no pandas)
+            posicoes = posicoes[:np.searchsorted(chaves, chaves.dtype.type(-acima_de), side="left")]
+        return posicoes
+
+    def posicoes(self, nivel=None, acima_de=None, semestre=None) -> np.ndarray:
+        """
+        Posições (na ordem das linhas) dos alunos que atendem a todos os filtros informados.
+
+        Args:
+            nivel: valor de Nível de Risco (ex.: "🔴 Alto").
+            acima_de: só alunos com Probabilidade estritamente maior que este valor.
+            semestre: valor de semestre_atual.
+        """
+        posicoes = np.sort(self._candidatos(nivel, acima_de))
+        if semestre is not None:
+            do_semestre = self._por_semestre.get(semestre, posicoes[:0])
+            posicoes = np.intersect1d(posicoes, do_semestre, assume_unique=True)
+        return posicoes
+
+    def maiores(self, k, nivel=None) -> np.ndarray:
+        """Posições dos k alunos de maior Probabilidade (do nível, se informado), da maior para a menor."""
+        return self._candidatos(nivel, None)[:k]
+
+    def filtrar(self, df: pd.DataFrame, **filtros) -> pd.DataFrame:
+        """df restrito às linhas de posicoes(**filtros), na ordem original (como uma máscara booleana)."""
+        _conferir(self, df)
+        return df.iloc[self.posicoes(**filtros)]
+
+    def top(self, df: pd.DataFrame, k, nivel=None) -> pd.DataFrame:
+        """Os k alunos de maior Probabilidade, já ordenados (como sort_values(...).head(k))."""
+        _conferir(self, df)
+        return df.iloc[self.maiores(k, nivel)]
+
+
+def _particionar(codigos, posicoes, grupos) -> list:
+    """Divide posicoes pelos códigos de pd.factorize (0..grupos-1; -1 = vazio), mantendo a ordem dentro de cada grupo."""
+    agrupadas = np.argsort(codigos, kind="stable")
+    limites = np.searchsorted(codigos[agrupadas], np.arange(grupos + 1))
+    return [posicoes[agrupadas[inicio:fim]] for inicio, fim in zip(limites[:-1], limites[1:])]
+
+
+def _conferir(indice, df):
+    if len(df) != indice.linhas:
+        raise ValueError(f"O índice foi montado para {indice.linhas} linhas, mas o DataFrame tem {len(df)}.")
+
+
+def obter_indice_risco(chave, df: pd.DataFrame) -> IndiceRisco:
+    """
+    Índice da coorte identificada por chave (a mesma usada no cache de coortes), montado na primeira consulta.
+
+    Args:
+        chave: tupla que identifica a coorte e sua versão (ex.: ("upload", hash, versao_modelo)).
+        df: a coorte, sem filtros (o índice só é montado a partir dele se ainda não estiver no cache).
+    """
+    def montar():
+        with etapa("indice_risco.montagem", len(df)):
+            return IndiceRisco(df)
+
+    indice = obter_coorte(("indice_risco",) + tuple(chave), montar)
+    _conferir(indice, df)
+    return indice
@@ -0,0 +1,126 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from io import BytesIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: os.O_APPEND já garante que cada write vai para o fim do arquivo
+    fcntl = None
+
+CAMINHO_LOG = "logs/acessos.jsonl"
+CAMINHO_LOG_LEGADO = "log_acessos.xlsx"
+TAMANHO_MAXIMO_LOG = 5 * 1024 * 1024  # bytes antes de rotacionar
+INTERVALO_FLUSH = 1.0  # segundos que um registro pode ficar no buffer
+MAX_BUFFER = 100
+
+# ======================
+# Escrita em buffer, somente acréscimo
+# ======================
+_buffer = []
+_trava = threading.Lock()
+_flusher = None
+
+
+def _rotacionar_se_necessario(caminho):
+    # Arquivos rotacionados são mantidos (histórico de auditoria), apenas com outro nome
+    if os.path.exists(caminho) and os.path.getsize(caminho) >= TAMANHO_MAXIMO_LOG:
+        base, ext = os.path.splitext(caminho)
+        os.replace(caminho, f"{base}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}")
+
+
+def _gravar(linhas, caminho=None):
+    caminho = caminho or CAMINHO_LOG
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    dados = "".join(linhas).encode("utf-8")
+
+    # Trava entre processos (ex.: vários workers do Streamlit) durante rotação + escrita
+    with open(caminho + ".lock", "a") as trava:
+        if fcntl:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+        try:
+            _rotacionar_se_necessario(caminho)
+            fd = os.open(caminho, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, dados)
+            finally:
+                os.close(fd)
+        finally:
+            if fcntl:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+
+def flush():
+    """Grava no disco os registros que ainda estão no buffer."""
+    global _buffer
+    with _trava:
+        pendentes, _buffer = _buffer, []
+        if pendentes:
+            _gravar(pendentes)
+
+
+def _loop_flush():
+    while True:
+        time.sleep(INTERVALO_FLUSH)
+        flush()
+
+
+def registrar_evento(usuario, quando=None):
+    """Acrescenta um acesso ao log. O custo não depende do tamanho do histórico."""
+    global _flusher
+    quando = quando or datetime.now()
+    linha = json.dumps({
+        "usuario": usuario,
+        "data": quando.strftime("%Y-%m-%d"),
+        "hora": quando.strftime("%H:%M:%S"),
+    }, ensure_ascii=False) + "\n"
+
+    with _trava:
+        _buffer.append(linha)
+        cheio = len(_buffer) >= MAX_BUFFER
+        if _flusher is None:
+            _flusher = threading.Thread(target=_loop_flush, daemon=True)
+            _flusher.start()
+    if cheio:
+        flush()
+
+
+atexit.register(flush)
+
+# ======================
+# Leitura e exportação para auditoria
+# ======================
+def carregar_log(caminho=CAMINHO_LOG):
+    """Histórico completo (DataFrame): planilha legada (se existir) + arquivos rotacionados + arquivo atual."""
+    # pandas só é importado aqui: registrar_evento roda na tela de login, que não deve esperar por ele
+    import pandas as pd
+
+    flush()
+    partes = []
+    if os.path.exists(CAMINHO_LOG_LEGADO):
+        partes.append(pd.read_excel(CAMINHO_LOG_LEGADO))
+
+    base, ext = os.path.splitext(caminho)
+    # Nomes rotacionados levam data/hora, então a ordem alfabética é a cronológica
+    arquivos = sorted(glob.glob(f"{base}-*{ext}"))
+    if os.path.exists(caminho):
+        arquivos.append(caminho)
+    for arquivo in arquivos:
+        partes.append(pd.read_json(arquivo, lines=True, dtype=False))
+
+    if not partes:
+        return pd.DataFrame(columns=["usuario", "data", "hora"])
+    return pd.concat(partes, ignore_index=True)
+
+
+def exportar_excel() -> BytesIO:
+    buffer = BytesIO()
+    carregar_log().to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
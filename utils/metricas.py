@@ -0,0 +1,261 @@
+import atexit
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.arquivos import remover_arquivo, temporario_ao_lado
+
+# ======================
+# Métricas de desempenho por etapa
+# ======================
+# Desligadas por padrão: etapa() devolve um contexto vazio e medido() chama a
+# função direto, sem tomar tempo nem travas. Para ligar:
+#   EVASAO_METRICAS=1                 coleta e grava logs/metricas.prom (formato Prometheus)
+#   EVASAO_METRICAS_PORTA=9464        também serve as métricas em http://localhost:9464/metrics
+CAMINHO_METRICAS = "logs/metricas.prom"
+INTERVALO_GRAVACAO = 10.0  # segundos entre gravações do arquivo
+PREFIXO = "evasao"
+# Limites superiores (segundos) dos buckets do histograma de latência
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ativo = os.environ.get("EVASAO_METRICAS", "").lower() in ("1", "true", "sim")
+_trava = threading.Lock()
+_etapas = {}      # nome -> _Histograma
+_contadores = {}  # nome -> valor
+_gravador = None
+_servidor = None
+
+
+class _Histograma:
+    __slots__ = ("buckets", "soma", "chamadas", "linhas")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # último = +Inf
+        self.soma = 0.0
+        self.chamadas = 0
+        self.linhas = 0
+
+    def observar(self, segundos, linhas):
+        self.buckets[bisect.bisect_left(BUCKETS, segundos)] += 1
+        self.soma += segundos
+        self.chamadas += 1
+        self.linhas += linhas or 0
+
+    def quantil(self, q):
+        # Estimativa pelo limite superior do bucket (mesma aproximação do histogram_quantile)
+        alvo, acumulado = q * self.chamadas, 0
+        for limite, qtd in zip(BUCKETS + (float("inf"),), self.buckets):
+            acumulado += qtd
+            if acumulado >= alvo:
+                return limite
+        return float("inf")
+
+
+class _EtapaNula:
+    linhas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULA = _EtapaNula()
+
+
+class _Etapa:
+    __slots__ = ("nome", "linhas", "inicio")
+
+    def __init__(self, nome, linhas):
+        self.nome = nome
+        self.linhas = linhas
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observar(self.nome, time.perf_counter() - self.inicio, self.linhas)
+        return False
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def ativar(ligar: bool = True):
+    """Liga (ou desliga) a coleta em tempo de execução e inicia a gravação periódica do arquivo."""
+    global _ativo
+    _ativo = ligar
+    if ligar:
+        _iniciar_exportacao()
+
+
+def etapa(nome: str, linhas: int = None):
+    """
+    Contexto que mede a duração de um trecho: with etapa("prever.forward", len(df)): ...
+
+    linhas também pode ser definido dentro do bloco (ctx.linhas = n), quando só é conhecido depois.
+    """
+    if not _ativo:
+        return _NULA
+    return _Etapa(nome, linhas)
+
+
+def medido(nome: str):
+    """Decorador equivalente a etapa(); conta como linhas o len() do primeiro argumento, se houver."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            linhas = len(args[0]) if args and hasattr(args[0], "__len__") else None
+            with _Etapa(nome, linhas):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def observar(nome: str, segundos: float, linhas: int = None):
+    if not _ativo:
+        return
+    with _trava:
+        histograma = _etapas.get(nome)
+        if histograma is None:
+            histograma = _etapas[nome] = _Histograma()
+        histograma.observar(segundos, linhas)
+
+
+def contar(nome: str, valor: int = 1):
+    if not _ativo:
+        return
+    with _trava:
+        _contadores[nome] = _contadores.get(nome, 0) + valor
+
+
+def limpar():
+    with _trava:
+        _etapas.clear()
+        _contadores.clear()
+
+# ======================
+# Leitura e exportação
+# ======================
+def resumo() -> list:
+    """Uma linha por etapa (para o painel de depuração)."""
+    with _trava:
+        return [
+            {
+                "etapa": nome,
+                "chamadas": h.chamadas,
+                "linhas": h.linhas,
+                "media_ms": 1000 * h.soma / h.chamadas,
+                "p95_ms": 1000 * h.quantil(0.95),
+                "total_s": h.soma,
+            }
+            for nome, h in sorted(_etapas.items())
+        ]
+
+
+def contadores() -> dict:
+    with _trava:
+        return dict(_contadores)
+
+
+def texto_prometheus() -> str:
+    linhas = [
+        f"# HELP {PREFIXO}_etapa_segundos Duração de cada etapa do pipeline.",
+        f"# TYPE {PREFIXO}_etapa_segundos histogram",
+    ]
+    with _trava:
+        for nome, h in sorted(_etapas.items()):
+            acumulado = 0
+            for limite, qtd in zip(BUCKETS + (float("inf"),), h.buckets):
+                acumulado += qtd
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append(f'{PREFIXO}_etapa_segundos_bucket{{etapa="{nome}",le="{le}"}} {acumulado}')
+            linhas.append(f'{PREFIXO}_etapa_segundos_sum{{etapa="{nome}"}} {h.soma!r}')
+            linhas.append(f'{PREFIXO}_etapa_segundos_count{{etapa="{nome}"}} {h.chamadas}')
+
+        linhas.append(f"# HELP {PREFIXO}_etapa_linhas_total Linhas (alunos) processadas por etapa.")
+        linhas.append(f"# TYPE {PREFIXO}_etapa_linhas_total counter")
+        for nome, h in sorted(_etapas.items()):
+            linhas.append(f'{PREFIXO}_etapa_linhas_total{{etapa="{nome}"}} {h.linhas}')
+
+        for nome, valor in sorted(_contadores.items()):
+            metrica = f"{PREFIXO}_{nome.replace('.', '_')}_total"
+            linhas.append(f"# TYPE {metrica} counter")
+            linhas.append(f"{metrica} {valor}")
+    return "\n".join(linhas) + "\n"
+
+
+def gravar_arquivo(caminho: str = None):
+    caminho = caminho or CAMINHO_METRICAS
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    # Temporário único: o app e o servico_pontuacao (cada um com sua thread e atexit) gravam o mesmo arquivo
+    temporario = temporario_ao_lado(caminho)
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(texto_prometheus())
+        os.replace(temporario, caminho)
+    except BaseException:
+        remover_arquivo(temporario)
+        raise
+
+
+def _loop_gravacao():
+    while True:
+        time.sleep(INTERVALO_GRAVACAO)
+        if _ativo:
+            gravar_arquivo()
+
+
+class _HandlerMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        corpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def servir(porta: int, endereco: str = "127.0.0.1"):
+    """Expõe /metrics em http://endereco:porta (thread em segundo plano, uma vez por processo)."""
+    global _servidor
+    if _servidor is None:
+        _servidor = ThreadingHTTPServer((endereco, porta), _HandlerMetricas)
+        threading.Thread(target=_servidor.serve_forever, daemon=True, name="metricas-http").start()
+    return _servidor
+
+
+def _iniciar_exportacao():
+    global _gravador
+    with _trava:
+        if _gravador is not None:
+            return
+        _gravador = threading.Thread(target=_loop_gravacao, daemon=True, name="metricas-arquivo")
+        _gravador.start()
+    atexit.register(lambda: _ativo and gravar_arquivo())
+    porta = os.environ.get("EVASAO_METRICAS_PORTA")
+    if porta:
+        try:
+            servir(int(porta))
+        except OSError:
+            pass  # outra instância do app já serve a porta
+
+
+if _ativo:
+    _iniciar_exportacao()
@@ -0,0 +1,123 @@
+import re
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table
+
+from utils.metricas import etapa
+
+# Linhas por tabela: cada tabela cabe em uma página A4 com fonte 9, o que evita
+# que o reportlab tenha que quebrar (e remedir) uma tabela gigante várias vezes
+LINHAS_POR_TABELA = 40
+# Acima deste tamanho o PDF em construção vai para um arquivo temporário em disco
+LIMITE_SPOOL = 32 * 1024 * 1024
+
+# ======================
+# Formatação vetorizada das células
+# ======================
+def coluna_ou_padrao(df: pd.DataFrame, coluna: str, padrao) -> pd.Series:
+    if coluna in df.columns:
+        return df[coluna]
+    return pd.Series([padrao] * len(df), index=df.index, dtype=object)
+
+
+def formatar_percentual(valores, casas=2) -> np.ndarray:
+    """Equivalente vetorizado de f"{p:.2%}" para uma coluna inteira."""
+    valores = np.asarray(valores, dtype=float) * 100
+    return np.char.mod(f"%.{casas}f%%", valores)
+
+
+def _valores_celula(coluna) -> list:
+    valores = np.asarray(coluna)
+    if valores.dtype == np.float32:
+        # Coorte compacta: texto pela menor representação do float32 (1.34, não 1.340000033378601)
+        valores = valores.astype(str)
+    return valores.astype(object).tolist()
+
+
+def como_celulas(*colunas) -> list:
+    """Junta colunas já formatadas em linhas de tabela (listas de valores Python)."""
+    return [list(linha) for linha in zip(*(_valores_celula(c) for c in colunas))]
+
+# ======================
+# Tabelas paginadas
+# ======================
+def tabelas_paginadas(cabecalho, linhas, estilo, col_widths, linhas_por_tabela=LINHAS_POR_TABELA) -> list:
+    """Divide as linhas em tabelas do tamanho de uma página, todas com o mesmo cabeçalho e estilo."""
+    tabelas = []
+    for inicio in range(0, max(len(linhas), 1), linhas_por_tabela):
+        tabela = Table([cabecalho] + linhas[inicio:inicio + linhas_por_tabela], repeatRows=1, colWidths=col_widths)
+        tabela.setStyle(estilo)
+        tabelas.append(tabela)
+    return tabelas
+
+# ======================
+# Construção do documento
+# ======================
+def novo_buffer_spool():
+    """Buffer em memória que passa para disco ao ultrapassar LIMITE_SPOOL."""
+    return tempfile.SpooledTemporaryFile(max_size=LIMITE_SPOOL)
+
+
+def construir_documento(elementos, destino=None, progresso=None, **opcoes_doc):
+    """
+    Monta o PDF em destino (caminho, arquivo aberto ou None para um BytesIO novo).
+
+    progresso, se informado, é chamado com a fração concluída (0.0 a 1.0) durante a montagem.
+    Retorna o destino (buffers voltam posicionados no início).
+    """
+    saida = BytesIO() if destino is None else destino
+    opcoes_doc.setdefault("pagesize", A4)
+    doc = SimpleDocTemplate(saida, **opcoes_doc)
+
+    if progresso is not None:
+        total = {"valor": max(len(elementos), 1)}
+
+        def _callback(tipo, valor):
+            if tipo == "SIZE_EST":
+                total["valor"] = max(valor, 1)
+            elif tipo == "PROGRESS":
+                progresso(min(valor / total["valor"], 1.0))
+            elif tipo == "FINISHED":
+                progresso(1.0)
+
+        doc.setProgressCallBack(_callback)
+
+    with etapa("relatorio.montagem_pdf"):
+        doc.build(elementos)
+    if hasattr(saida, "seek"):
+        saida.seek(0)
+    return saida
+
+# ======================
+# Um PDF por grupo
+# ======================
+def _nome_arquivo(grupo) -> str:
+    return re.sub(r"[^0-9A-Za-zÀ-ÿ]+", "_", str(grupo)).strip("_") or "grupo"
+
+
+def gerar_relatorios_por_grupo(df: pd.DataFrame, coluna: str, gerar, titulo: str, progresso=None, destino=None):
+    """
+    Gera um PDF por valor de coluna (ex.: "Nível de Risco" ou "semestre_atual") e devolve um .zip com todos.
+
+    gerar deve aceitar (df_grupo, titulo, destino=...) e gravar o PDF em destino. Cada PDF é montado num
+    buffer spool e copiado em blocos para o .zip, gravado em destino (por padrão um BytesIO).
+    """
+    grupos = list(df.groupby(coluna, sort=True, observed=True))  # categorias sem alunos não geram PDF
+    saida = BytesIO() if destino is None else destino
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for i, (grupo, parte) in enumerate(grupos):
+            with novo_buffer_spool() as pdf:
+                gerar(parte, f"{titulo} — {grupo}", destino=pdf)
+                pdf.seek(0)
+                with arquivo_zip.open(f"relatorio_{_nome_arquivo(grupo)}.pdf", "w") as membro:
+                    shutil.copyfileobj(pdf, membro)
+            if progresso is not None:
+                progresso((i + 1) / len(grupos))
+    saida.seek(0)
+    return saida
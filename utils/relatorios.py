@@ -1,12 +1,26 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import Paragraph, Spacer, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
-from io import BytesIO
 
-def gerar_relatorio_pdf(df_risco, titulo="Relatório de Risco Acadêmico"):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
+from utils.metricas import medido
+from utils.motor_relatorios import (
+    coluna_ou_padrao, como_celulas, construir_documento, formatar_percentual, tabelas_paginadas,
+)
+
+@medido("relatorio.geral")
+def gerar_relatorio_pdf(df_risco, titulo="Relatório de Risco Acadêmico", destino=None, progresso=None, individual=None):
+    """
+    Gera o PDF de risco, individual (um aluno) ou geral (distribuição e tabela).
+
+    Args:
+        individual: True/False escolhe o formato; None (padrão) usa o individual só se df_risco tiver uma linha.
+            Relatórios gerais e por grupo devem passar False: um grupo com um único aluno continua no formato geral.
+        destino: caminho ou arquivo onde gravar o PDF (ex.: novo_buffer_spool()); por padrão um BytesIO.
+        progresso: função opcional chamada com a fração concluída (0.0 a 1.0).
+
+    Returns:
+        destino com o PDF, posicionado no início.
+    """
     styles = getSampleStyleSheet()
     elementos = []
 
@@ -17,7 +31,10 @@ def gerar_relatorio_pdf(df_risco, titulo="Relatório de Risco Acadêmico"):
     elementos.append(Paragraph(titulo, estilo_titulo))
     elementos.append(Spacer(1, 16))
 
-    if len(df_risco) == 1:
+    if individual is None:
+        individual = len(df_risco) == 1
+
+    if individual:
         aluno = df_risco.iloc[0]
         elementos.append(Paragraph(f"<b>ID do Aluno:</b> {aluno['id_aluno']}", estilo_normal))
         elementos.append(Paragraph(f"<b>Probabilidade de Evasão:</b> {aluno['Probabilidade']:.2%}", estilo_normal))
@@ -39,30 +56,25 @@ def gerar_relatorio_pdf(df_risco, titulo="Relatório de Risco Acadêmico"):
     else:
         # Relatório geral com distribuição
         elementos.append(Paragraph(f"<b>Total de alunos:</b> {len(df_risco)}", estilo_subtitulo))
-        risco_counts = df_risco["Nível de Risco"].value_counts().to_dict()
+        # Só níveis com alunos (numa coluna categórica value_counts também lista os vazios)
+        risco_counts = {risco: qtd for risco, qtd in df_risco["Nível de Risco"].value_counts().items() if qtd}
         for risco, qtd in risco_counts.items():
             elementos.append(Paragraph(f"{risco}: {qtd} aluno(s)", estilo_normal))
         elementos.append(Spacer(1, 12))
 
-        # Tabela com os dados principais
-        tabela_dados = [["ID", "Probabilidade", "Nível de Risco"]]
-        for _, row in df_risco.iterrows():
-            tabela_dados.append([
-                str(row.get("id_aluno", "")),
-                f"{row['Probabilidade']:.2%}",
-                row["Nível de Risco"]
-            ])
-
-        tabela = Table(tabela_dados, repeatRows=1, colWidths=[70, 110, 130])
-        tabela.setStyle(TableStyle([
+        # Tabela com os dados principais (células formatadas por coluna, uma tabela por página)
+        linhas = como_celulas(
+            coluna_ou_padrao(df_risco, "id_aluno", "").astype(str),
+            formatar_percentual(df_risco["Probabilidade"]),
+            df_risco["Nível de Risco"],
+        )
+        estilo_tabela = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
             ('GRID', (0, 0), (-1, -1), 0.3, colors.grey),
             ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ]))
-        elementos.append(tabela)
+        ])
+        elementos.extend(tabelas_paginadas(["ID", "Probabilidade", "Nível de Risco"], linhas, estilo_tabela, [70, 110, 130]))
 
-    doc.build(elementos)
-    buffer.seek(0)
-    return buffer
+    return construir_documento(elementos, destino, progresso)
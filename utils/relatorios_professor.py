@@ -1,34 +1,40 @@
 from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import Paragraph, Spacer, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from datetime import datetime
-import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.figure import Figure
 from reportlab.platypus import Image
 
+from utils.graficos import posicoes_maior_risco
+from utils.metricas import medido
+from utils.motor_relatorios import coluna_ou_padrao, como_celulas, construir_documento, tabelas_paginadas
+
 def gerar_grafico_barras_top_alunos(df_nivel, titulo):
-    import matplotlib.pyplot as plt
-    fig, ax = plt.subplots(figsize=(6, 4))
+    # Figure direto (sem pyplot): pode ser gerado com segurança fora da thread principal
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
 
-    top = df_nivel.sort_values(by="Probabilidade", ascending=False).head(10)
+    # Seleção parcial dos 10 maiores (argpartition) e ordenação só deles, sem ordenar o grupo inteiro
+    top = df_nivel.iloc[posicoes_maior_risco(df_nivel["Probabilidade"], 10)]
+    top = top.sort_values(by="Probabilidade", ascending=False, kind="stable")
     nomes = top["nome_aluno"] if "nome_aluno" in top.columns else top["id_aluno"].astype(str)
     valores = (top["Probabilidade"] * 100).round(1)
 
     ax.barh(nomes[::-1], valores[::-1], color="blue")
     ax.set_title(titulo)
     ax.set_xlabel("Probabilidade de Evasão (%)")
-    plt.tight_layout()
+    fig.tight_layout()
 
     buffer = BytesIO()
-    plt.savefig(buffer, format="png")
+    fig.savefig(buffer, format="png")
     buffer.seek(0)
-    plt.close(fig)
     return buffer
 
-def gerar_pdf_risco_alunos(df, titulo="Relatório de Alunos em Risco"):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
+@medido("relatorio.risco_alunos")
+def gerar_pdf_risco_alunos(df, titulo="Relatório de Alunos em Risco", destino=None, progresso=None):
+    # destino/progresso: ver construir_documento (por padrão devolve um BytesIO)
     styles = getSampleStyleSheet()
     normal = styles["Normal"]
     bold = styles["Heading2"]
@@ -57,30 +63,31 @@ def gerar_pdf_risco_alunos(df, titulo="Relatório de Alunos em Risco"):
         elements.append(Paragraph(f"<i>Erro ao gerar gráfico: {e}</i>", styles["Normal"]))
         elements.append(Spacer(1, 12))
 
+    # Posições de cada nível numa única passada (em vez de uma máscara por nível)
+    posicoes_nivel = df.groupby("Nível de Risco", observed=True, sort=False).indices
     for nivel in niveis:
-        grupo = df[df["Nível de Risco"] == nivel]
-        if grupo.empty:
+        if nivel not in posicoes_nivel:
             continue
+        grupo = df.iloc[posicoes_nivel[nivel]]
 
         # Título da seção
         elements.append(Paragraph(f"<b>Grupo: {nivel}</b>", ParagraphStyle(name="Secao", textColor=cores[nivel], fontSize=14)))
         elements.append(Spacer(1, 6))
 
-        # Tabela com sugestões
+        # Tabela com sugestões (células formatadas por coluna, uma tabela por página)
         headers = ["ID", "Nome", "Probabilidade (%)", "Recomendação", "Notas", "Frequência", "Aprovação"]
-        dados = [headers]
-        for _, row in grupo.iterrows():
-            prob = round(row.get("Probabilidade", 0) * 100, 1)
-            nome = row.get("nome_aluno", f"Aluno {row['id_aluno']}")
-            recomendacao = row.get("Situação Sugerida", "")
-            nota = round(row.get("media_notas", 0), 2)
-            freq = round(row.get("frequencia", 0), 2)
-            aprov = round(row.get("taxa_aprovacao", 0), 2)
-
-            dados.append([row["id_aluno"], nome, f"{prob}%", recomendacao, nota, freq, aprov])
-
-        tabela = Table(dados, colWidths=[50, 130, 70, 170, 50, 50, 60])
-        tabela.setStyle(TableStyle([
+        ids = grupo["id_aluno"]
+        nomes = grupo["nome_aluno"] if "nome_aluno" in grupo.columns else "Aluno " + ids.astype(str)
+        prob = (pd.to_numeric(coluna_ou_padrao(grupo, "Probabilidade", 0)) * 100).round(1).astype(str) + "%"
+        linhas = como_celulas(
+            ids,
+            nomes,
+            prob,
+            coluna_ou_padrao(grupo, "Situação Sugerida", ""),
+            *(pd.to_numeric(coluna_ou_padrao(grupo, col, 0)).round(2) for col in ["media_notas", "frequencia", "taxa_aprovacao"]),
+        )
+
+        estilo_tabela = TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), cores[nivel]),
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
             ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -90,12 +97,12 @@ def gerar_pdf_risco_alunos(df, titulo="Relatório de Alunos em Risco"):
             ("LEFTPADDING", (0, 0), (-1, -1), 4),
             ("RIGHTPADDING", (0, 0), (-1, -1), 4),
             ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ]))
+        ])
 
-        elements.append(tabela)
+        elements.extend(tabelas_paginadas(headers, linhas, estilo_tabela, [50, 130, 70, 170, 50, 50, 60]))
         elements.append(Spacer(1, 16))
         elements.append(PageBreak())
 
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
+    return construir_documento(
+        elements, destino, progresso, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36
+    )
@@ -2,17 +2,150 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from model.inferencia_modelo import prever_risco_evasao
+from model.inferencia_modelo import prever_risco_evasao, versao_modelo
+from model.pontuacao_lote import pontuar_csv_em_blocos, NIVEIS_RISCO
+from model.pontuacao_individual import prever_aluno
+from model.ingestao_csv import ler_csv_alunos, problemas_ingestao, ErroIngestao
 from utils.relatorios import gerar_relatorio_pdf
+from utils.motor_relatorios import gerar_relatorios_por_grupo, novo_buffer_spool
+from utils.graficos import histograma
+from utils import metricas
+from utils.cache_coortes import cache_coortes, obter_coorte
+from utils.indice_risco import obter_indice_risco
+from utils.log_acessos import exportar_excel
+from utils.armazenamento_bases import salvar_base, converter_csv, ler_base, exportar_csv, publicar_base_oficial, compactar_coorte, SaidaLote, ErroValoresInvalidos
+from utils.indice_analises import registrar_analise, listar_analises, previa_como_dataframe
 from auth import logout
 import datetime
-import glob
+import hashlib
 import os
+from functools import partial
+
+# Relatório geral (e de cada grupo) sempre no formato geral, mesmo com um único aluno
+gerar_relatorio_geral = partial(gerar_relatorio_pdf, individual=False)
+
+# Uploads acima deste tamanho são pontuados em blocos, sem carregar o arquivo inteiro em memória
+LIMITE_UPLOAD_EM_MEMORIA = 100 * 1024 * 1024
+
+def hash_upload(arquivo_csv):
+    # Calculado uma única vez por arquivo enviado na sessão
+    chave = f"hash_upload_{arquivo_csv.file_id}"
+    if chave not in st.session_state:
+        st.session_state[chave] = hashlib.sha256(arquivo_csv.getvalue()).hexdigest()
+    return st.session_state[chave]
+
+def analisar_upload(hash_conteudo, versao, arquivo_csv):
+    # Lido, validado e pontuado uma vez por (conteúdo, versão do modelo) e compartilhado entre reruns e sessões
+    # pelo cache de coortes do processo (limite de memória, LRU); cada chamada recebe uma cópia copy-on-write.
+    lido = {}
+
+    def ingerir():
+        arquivo_csv.seek(0)
+        with metricas.etapa("upload.leitura_csv") as medicao:
+            lido["ingestao"] = ler_csv_alunos(arquivo_csv)
+            medicao.linhas = len(lido["ingestao"].df)
+        return lido["ingestao"]
+
+    def pontuar():
+        ingestao = lido.get("ingestao") or ingerir()
+        # O resultado fica em memória já compacto
+        return compactar_coorte(prever_risco_evasao(ingestao.df))
+
+    # O relatório de validação aparece antes da pontuação (colunas ruins não viram zeros silenciosos)
+    relatorio = obter_coorte(("validacao_upload", hash_conteudo, versao), lambda: ingerir().relatorio)
+    exibir_relatorio_ingestao(relatorio)
+
+    with st.spinner("🔄 Analisando alunos..."):
+        return obter_coorte(("upload", hash_conteudo, versao), pontuar)
+
+def exibir_relatorio_ingestao(relatorio):
+    problemas = problemas_ingestao(relatorio)
+    if not problemas.empty:
+        st.warning(f"⚠️ {len(problemas)} coluna(s) com problemas no arquivo. Valores inválidos foram tratados como vazios "
+                   "e colunas ausentes valem 0 para o modelo.")
+        with st.expander("🔎 Relatório de validação do arquivo"):
+            st.dataframe(problemas, hide_index=True, use_container_width=True)
+    ignoradas = relatorio.loc[relatorio["situação"] == "ignorada", "coluna"].tolist()
+    if ignoradas:
+        st.caption("Colunas ignoradas (fora do esquema do modelo): " + ", ".join(f"`{col}`" for col in ignoradas))
+
+def analisar_lote_grande(arquivo_csv):
+    st.info("📦 Arquivo grande: a análise será feita em blocos, com resumo agregado.")
+
+    # Guarda o resultado na sessão para não reprocessar o arquivo a cada interação. Uma saída por sessão:
+    # o CSV da análise anterior é apagado ao trocar de arquivo, e o atual quando a sessão termina (SaidaLote)
+    guardado = st.session_state.get("lote_grande")
+    if guardado is None or guardado[0] != arquivo_csv.file_id:
+        if guardado is not None:
+            guardado[1].remover()
+            del st.session_state["lote_grande"]
+        progresso = st.empty()
+        saida = SaidaLote()
+        acumulador = pontuar_csv_em_blocos(
+            arquivo_csv, saida.caminho,
+            ao_processar_bloco=lambda acc: progresso.text(f"⏳ {acc.total} aluno(s) processado(s)...")
+        )
+        progresso.empty()
+        st.session_state["lote_grande"] = (arquivo_csv.file_id, saida, acumulador)
+    _, saida, acumulador = st.session_state["lote_grande"]
+    caminho_saida = saida.caminho
+
+    st.success(f"✅ {acumulador.total} registros analisados.")
+
+    st.markdown("#### 📌 Resumo")
+    for risco in NIVEIS_RISCO:
+        st.markdown(f"- {risco}: **{acumulador.contagem_risco.get(risco, 0)} aluno(s)**")
+
+    media_semestre = acumulador.media_por_semestre()
+    if not media_semestre.empty:
+        st.markdown("#### 📈 Evolução do Risco por Semestre")
+        fig_linha = px.line(media_semestre, x="semestre_atual", y="Probabilidade", markers=True)
+        st.plotly_chart(fig_linha, use_container_width=True)
+
+    with st.expander("📥 Exportar ou Salvar Análise"):
+        with open(caminho_saida, "rb") as f:
+            st.download_button("⬇️ Baixar CSV", f, file_name="alunos_analisados.csv", mime="text/csv")
+
+        st.markdown("---")
+        etiqueta = st.text_input("📝 Nome do lote (opcional)", value="analise")
+        if st.button("💾 Salvar como Base Oficial"):
+            agora = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
+            nome_arquivo = f"dataset/base_{etiqueta}_{agora}.feather".replace(" ", "_")
+            try:
+                nome_arquivo = converter_csv(caminho_saida, nome_arquivo)
+            except ErroValoresInvalidos as e:
+                st.error(f"❌ Base não salva: {e}")
+            else:
+                registrar_analise(nome_arquivo, versao_modelo=versao_modelo())
+                st.success(f"📁 Base salva como `{nome_arquivo}`.")
+
+def exibir_metricas_sidebar():
+    # Painel de depuração: só aparece com EVASAO_METRICAS=1 (valores acumulados no processo até o rerun anterior)
+    with st.sidebar.expander("🛠️ Métricas de desempenho"):
+        resumo = pd.DataFrame(metricas.resumo())
+        if resumo.empty:
+            st.caption("Nenhuma etapa medida ainda.")
+        else:
+            st.dataframe(resumo.round({"media_ms": 1, "p95_ms": 1, "total_s": 3}), hide_index=True, use_container_width=True)
+
+        coortes = cache_coortes.estatisticas()
+        st.caption(f"Cache de coortes: {coortes['coortes']} entrada(s), {coortes['mb']} de {coortes['limite_mb']} MB, "
+                   f"{coortes['acertos']} acerto(s), {coortes['despejos']} despejo(s)")
+
+        st.download_button("⬇️ Métricas (Prometheus)", metricas.texto_prometheus(), file_name="metricas.prom",
+                           mime="text/plain", use_container_width=True)
 
 def painel_coordenador():
     st.title("📈 Previsão de Evasão Acadêmica - Coordenador")
     st.sidebar.title("🎯 Menu do Coordenador")
     st.sidebar.button("🚪 Sair", use_container_width=True, on_click=logout)
+    st.sidebar.caption(f"🧠 Versão do modelo: `{versao_modelo()}`")
+    if st.sidebar.button("🗂️ Exportar log de acessos", use_container_width=True):
+        st.sidebar.download_button("⬇️ Baixar log (Excel)", exportar_excel(), file_name="log_acessos.xlsx",
+                                   mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                   use_container_width=True)
+    if metricas.ativo():
+        exibir_metricas_sidebar()
 
     tab1, tab2, tab3, tab4 = st.tabs(["📤 Análise por Lote", "🧪 Aluno Manual", "👤 Análise Individual", "📚 Histórico de Análises"])
 
@@ -28,10 +161,18 @@ def painel_coordenador():
             st.info("📎 Envie um arquivo CSV para iniciar a análise.")
             return
 
-        # 1. Processamento inicial
-        df = pd.read_csv(arquivo_csv)
-        st.success(f"✅ {len(df)} registros carregados com sucesso.")
-        df_pred = prever_risco_evasao(df)
+        if arquivo_csv.size > LIMITE_UPLOAD_EM_MEMORIA:
+            analisar_lote_grande(arquivo_csv)
+            return
+
+        # 1. Processamento inicial (em cache pelo conteúdo do arquivo)
+        hash_conteudo, versao = hash_upload(arquivo_csv), versao_modelo()
+        try:
+            df_pred = analisar_upload(hash_conteudo, versao, arquivo_csv)
+        except ErroIngestao as e:
+            st.error(f"❌ {e}")
+            return
+        st.success(f"✅ {len(df_pred)} registros carregados com sucesso.")
 
         if df_pred.empty:
             st.warning("⚠️ A análise gerou uma base vazia. Verifique os dados enviados.")
@@ -42,12 +183,13 @@ def painel_coordenador():
         col1, col2 = st.columns([2, 1])
         with col1:
             risco_opcao = st.radio("Filtrar por risco:", ["Todos", "🟢 Baixo", "🟠 Médio", "🔴 Alto"], horizontal=True)
-            if risco_opcao != "Todos":
-                df_pred = df_pred[df_pred["Nível de Risco"] == risco_opcao]
         with col2:
             risco_acima_90 = st.checkbox("🔎 Apenas alunos com risco > 90%")
-            if risco_acima_90:
-                df_pred = df_pred[df_pred["Probabilidade"] > 0.9]
+        if risco_opcao != "Todos" or risco_acima_90:
+            # Fatias do índice da coorte (montado no primeiro filtro), sem varrer df_pred a cada rerun
+            indice = obter_indice_risco(("upload", hash_conteudo, versao), df_pred)
+            df_pred = indice.filtrar(df_pred, nivel=None if risco_opcao == "Todos" else risco_opcao,
+                                     acima_de=0.9 if risco_acima_90 else None)
 
         # 3. Tabela com resultados
         st.markdown("### 📋 Alunos Analisados")
@@ -65,14 +207,19 @@ def painel_coordenador():
             etiqueta = st.text_input("📝 Nome do lote (opcional)", value="analise")
             if st.button("💾 Salvar como Base Oficial"):
                 agora = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
-                nome_arquivo = f"dataset/base_{etiqueta}_{agora}.csv".replace(" ", "_")
-                df_pred.to_csv(nome_arquivo, index=False)
-                st.success(f"📁 Base salva como `{nome_arquivo}`.")
+                nome_arquivo = f"dataset/base_{etiqueta}_{agora}.feather".replace(" ", "_")
+                try:
+                    nome_arquivo = salvar_base(df_pred, nome_arquivo)
+                except ErroValoresInvalidos as e:
+                    st.error(f"❌ Base não salva: {e}")
+                else:
+                    registrar_analise(nome_arquivo, df_pred, versao_modelo())
+                    st.success(f"📁 Base salva como `{nome_arquivo}`.")
 
         # 5. Gráficos e análises visuais
         with st.expander("📊 Gráficos e Relatórios"):
             st.markdown("#### 📊 Distribuição por Risco")
-            fig_risco = px.histogram(
+            fig_risco = histograma(
                 df_pred,
                 x="Nível de Risco",
                 color="Nível de Risco",
@@ -82,7 +229,7 @@ def painel_coordenador():
             st.plotly_chart(fig_risco, use_container_width=True)
 
             st.markdown("#### 📈 Probabilidade de Evasão")
-            fig_prob = px.histogram(df_pred, x="Probabilidade", nbins=20, marginal="rug")
+            fig_prob = histograma(df_pred, x="Probabilidade", nbins=20, marginal="rug")
             st.plotly_chart(fig_prob, use_container_width=True)
 
             if "semestre_atual" in df_pred.columns:
@@ -92,7 +239,7 @@ def painel_coordenador():
                 st.plotly_chart(fig_linha, use_container_width=True)
 
             st.markdown("#### 📊 Média de Desempenho por Risco")
-            media_risco = df_pred.groupby("Nível de Risco")[["media_notas", "frequencia", "taxa_aprovacao"]].mean().reset_index()
+            media_risco = df_pred.groupby("Nível de Risco", observed=True)[["media_notas", "frequencia", "taxa_aprovacao"]].mean().reset_index()
             fig_media = px.bar(
                 media_risco.melt(id_vars="Nível de Risco", var_name="Métrica", value_name="Valor"),
                 x="Métrica", y="Valor", color="Nível de Risco", barmode="group",
@@ -108,9 +255,22 @@ def painel_coordenador():
                 st.markdown(f"- {risco}: **{qtd} aluno(s)**")
 
             st.markdown("#### 📄 Relatório Geral")
+            separar_por = st.selectbox("Separar relatório por", ["Não separar", "Nível de Risco", "Semestre"])
             if st.button("📥 Baixar Relatório Geral"):
-                relatorio = gerar_relatorio_pdf(df_pred, "Relatório de Risco Geral")
-                st.download_button("⬇️ Download", relatorio.getvalue(), file_name="relatorio_geral.pdf", mime="application/pdf")
+                barra = st.progress(0.0, text="Gerando relatório...")
+                atualizar_barra = lambda fracao: barra.progress(fracao, text="Gerando relatório...")
+                coluna_grupo = {"Nível de Risco": "Nível de Risco", "Semestre": "semestre_atual"}.get(separar_por)
+                if coluna_grupo and coluna_grupo in df_pred.columns:
+                    relatorio = gerar_relatorios_por_grupo(df_pred, coluna_grupo, gerar_relatorio_geral, "Relatório de Risco Geral", atualizar_barra,
+                                                          destino=novo_buffer_spool())
+                    arquivo, mime = "relatorios_por_grupo.zip", "application/zip"
+                else:
+                    relatorio = gerar_relatorio_geral(df_pred, "Relatório de Risco Geral", destino=novo_buffer_spool(), progresso=atualizar_barra)
+                    arquivo, mime = "relatorio_geral.pdf", "application/pdf"
+                barra.empty()
+                # O download_button só aceita bytes/BytesIO: o conteúdo sai do spool (já no início) uma única vez
+                with relatorio:
+                    st.download_button("⬇️ Download", relatorio.read(), file_name=arquivo, mime=mime)
 
     # ==================== TAB 2: Inserção Manual ====================
     with tab2:
@@ -140,21 +300,25 @@ def painel_coordenador():
 
         incluir = st.checkbox("➕ Incluir na análise geral")
 
+        aluno_manual = {
+            "id_aluno": id_manual,
+            "media_notas": media_notas,
+            "frequencia": frequencia,
+            "taxa_aprovacao": taxa_aprovacao,
+            "total_semestres_cursados": total_semestres,
+            "qtd_trancamentos": trancamentos,
+            "semestre_atual": semestre_atual,
+            "nota_disciplina1": nota1, "nota_disciplina2": nota2, "nota_disciplina3": nota3,
+            "nota_disciplina4": nota4, "nota_disciplina5": nota5, "nota_disciplina6": nota6,
+            "nota_disciplina7": nota7, "nota_disciplina8": nota8, "nota_disciplina9": nota9,
+            "nota_disciplina10": nota10
+        }
+        # Caminho rápido de um aluno (microssegundos): a prévia acompanha cada alteração do formulário
+        resultado_manual = prever_aluno(aluno_manual)
+        st.caption(f"Prévia: {resultado_manual['Nível de Risco']} ({resultado_manual['Probabilidade']:.2%})")
+
         if st.button("🔍 Prever Risco"):
-            aluno_manual = pd.DataFrame([{
-                "id_aluno": id_manual,
-                "media_notas": media_notas,
-                "frequencia": frequencia,
-                "taxa_aprovacao": taxa_aprovacao,
-                "total_semestres_cursados": total_semestres,
-                "qtd_trancamentos": trancamentos,
-                "semestre_atual": semestre_atual,
-                "nota_disciplina1": nota1, "nota_disciplina2": nota2, "nota_disciplina3": nota3,
-                "nota_disciplina4": nota4, "nota_disciplina5": nota5, "nota_disciplina6": nota6,
-                "nota_disciplina7": nota7, "nota_disciplina8": nota8, "nota_disciplina9": nota9,
-                "nota_disciplina10": nota10
-            }])
-            df_manual_pred = prever_risco_evasao(aluno_manual)
+            df_manual_pred = pd.DataFrame([{**aluno_manual, **resultado_manual}])
             aluno = df_manual_pred.iloc[0]
             st.success(f"Previsão: {aluno['Nível de Risco']} ({aluno['Probabilidade']:.2%})")
 
@@ -214,7 +378,7 @@ def painel_coordenador():
             st.subheader("📄 Relatório do Aluno Selecionado")
             if st.button(f"📥 Baixar Relatório de {aluno_id}"):
                 df_individual = df_pred[df_pred["id_aluno"] == aluno_id]
-                relatorio_ind = gerar_relatorio_pdf(df_individual, f"Relatório do Aluno {aluno_id}")
+                relatorio_ind = gerar_relatorio_pdf(df_individual, f"Relatório do Aluno {aluno_id}", individual=True)
                 st.download_button(f"⬇️ Download Aluno {aluno_id}", relatorio_ind.getvalue(), file_name=f"relatorio_aluno_{aluno_id}.pdf", mime="application/pdf")
         else:
             st.info("📎 Nenhum dado disponível. Envie um CSV em 'Análise por Lote' ou adicione manualmente um aluno em 'Aluno Manual'.")
@@ -223,29 +387,38 @@ def painel_coordenador():
     with tab4:
         st.subheader("📚 Histórico de Análises Salvas")
 
-        arquivos = sorted(glob.glob("dataset/base_*.csv"), reverse=True)
+        # Só o índice de manifestos é lido aqui; a base completa é carregada sob demanda
+        analises = listar_analises()
 
-        if not arquivos:
+        if not analises:
             st.info("📂 Nenhuma análise salva foi encontrada.")
         else:
-            for arq in arquivos:
-                nome = os.path.basename(arq)
+            for analise in analises:
+                arq, nome = analise["arquivo"], analise["nome"]
                 with st.expander(f"📄 {nome}", expanded=False):
                     try:
-                        df_hist = pd.read_csv(arq)
-                        st.markdown(f"**👥 Registros:** {len(df_hist)}")
-                        st.dataframe(df_hist.head(10), use_container_width=True)
-
-                        with open(arq, "rb") as f:
+                        st.markdown(f"**👥 Registros:** {analise['linhas']}")
+                        if analise["distribuicao_risco"]:
+                            st.markdown(" | ".join(
+                                f"{risco}: **{analise['distribuicao_risco'].get(risco, 0)}**"
+                                for risco in ["🟢 Baixo", "🟠 Médio", "🔴 Alto"]
+                            ))
+                        st.caption(f"Salva em {analise['salvo_em']} · modelo `{analise['versao_modelo'] or '-'}` · sha256 `{analise['sha256'][:12]}`")
+                        st.dataframe(previa_como_dataframe(analise), use_container_width=True)
+
+                        if st.button("📂 Carregar base completa", key=f"carregar_{nome}"):
+                            st.dataframe(ler_base(arq), use_container_width=True)
+
+                        if st.button(f"⬇️ Preparar download de {nome}", key=f"download_{nome}"):
                             st.download_button(
-                                label=f"⬇️ Baixar {nome}",
-                                data=f,
-                                file_name=nome,
+                                label="⬇️ Baixar CSV",
+                                data=exportar_csv(arq),
+                                file_name=os.path.splitext(nome)[0] + ".csv",
                                 mime="text/csv"
                             )
 
                         if st.button("📌 Definir como Base para Professores", key=nome):
-                            df_hist.to_csv("dataset/dataSetSintetico.csv", index=False)
+                            publicar_base_oficial(ler_base(arq))
                             st.success("✅ Base atualizada com sucesso e liberada para o painel do professor.")
 
                     except Exception as e:
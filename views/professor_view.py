@@ -1,10 +1,15 @@
-import os
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from auth import logout
 from utils.relatorios_professor import gerar_pdf_risco_alunos
+from utils.armazenamento_bases import caminho_base_oficial, base_oficial_atual, ler_base_oficial, COLUNAS_PROFESSOR
+from utils.fila_relatorios import solicitar_relatorio, consultar_relatorio
+from utils.agregados_base import obter_agregados, calcular_agregados, consolidado_como_dataframe
+from utils.graficos import dispersao
+from utils.indice_risco import obter_indice_risco
+from utils.metricas import etapa
 
 # ================== Função Principal ==================
 def painel_professor():
@@ -13,14 +18,12 @@ def painel_professor():
 
     st.title("📘 Painel do Professor")
 
-    path_base = "dataset/dataSetSintetico.csv"
-    if not os.path.exists(path_base):
+    if caminho_base_oficial() is None:
         st.warning("⚠️ Nenhuma base oficial disponível. Aguarde o coordenador salvar uma análise.")
         return
 
-    df = pd.read_csv(path_base)
-    nome_base = os.path.basename(path_base)
-    st.info(f"📂 Base oficial em uso: `{nome_base}` com {len(df)} aluno(s)")
+    versao, df, agregados = carregar_base_oficial()
+    st.info(f"📂 Base oficial em uso: versão `{versao}` com {len(df)} aluno(s)")
 
     tab1, tab2, tab3 = st.tabs([
         "📋 Dados Consolidados",
@@ -29,23 +32,46 @@ def painel_professor():
     ])
 
     with tab1:
-        exibir_consolidados(df)
+        with etapa("professor.exibir_consolidados", len(df)):
+            exibir_consolidados(df, agregados)
 
     with tab2:
-        exibir_dashboard(df)
+        with etapa("professor.exibir_dashboard", len(df)):
+            exibir_dashboard(df, agregados)
 
     with tab3:
-        identificar_alunos_em_risco(df)
+        with etapa("professor.identificar_alunos_em_risco", len(df)):
+            identificar_alunos_em_risco(df, agregados, versao)
+
+# ================== Base oficial ==================
+def carregar_base_oficial():
+    """
+    (versão, DataFrame, agregados) da base oficial publicada.
+
+    O DataFrame vem do cache de coortes do processo, compartilhado por todas as sessões e
+    relido só quando o coordenador publica outra versão; a sessão guarda apenas os agregados.
+    """
+    # Leitura colunar por memory map, apenas das colunas usadas no painel
+    with etapa("professor.leitura_base") as medicao:
+        ponteiro, df = ler_base_oficial(COLUNAS_PROFESSOR)
+        medicao.linhas = len(df)
+
+    versao = ponteiro["versao"]
+    guardados = st.session_state.get("agregados_base_oficial")
+    if guardados is None or guardados[0] != versao:
+        # Resumos calculados na publicação da base (não são refeitos a cada clique)
+        with etapa("professor.agregados", len(df)):
+            guardados = (versao, obter_agregados(ponteiro["caminho"], df))
+        st.session_state["agregados_base_oficial"] = guardados
+    return versao, df, guardados[1]
 
 # ================== Sidebar ==================
 def configurar_sidebar():
     st.sidebar.title("🎯 Menu de Controle")
     st.sidebar.markdown("Sistema de Gestão Acadêmica")
 
-    path = "dataset/dataSetSintetico.csv"
-    if os.path.exists(path):
-        df = pd.read_csv(path)
-        st.sidebar.metric("👥 Total de Alunos", len(df))
+    if caminho_base_oficial() is not None:
+        st.sidebar.metric("👥 Total de Alunos", base_oficial_atual()["linhas"])
     else:
         st.sidebar.info("Base oficial ainda não disponível.")
 
@@ -53,42 +79,35 @@ def configurar_sidebar():
         logout()
 
 # ================== TAB 1 — Consolidados + Análises Gerais ==================
-def exibir_consolidados(df):
+def exibir_consolidados(df, agregados=None):
     st.header("📋 Consolidados por Semestre")
 
     if "semestre_atual" not in df.columns:
         st.info("A coluna 'semestre_atual' não existe nesta base.")
         return
 
-    semestres = sorted(df["semestre_atual"].dropna().unique())
+    # Uma linha por semestre, já agregada na publicação da base
+    resumo = consolidado_como_dataframe(agregados or calcular_agregados(df))
+
+    semestres = resumo["Semestre"].tolist()
     semestre = st.selectbox("📚 Semestre", ["Todos"] + [str(s) for s in semestres])
 
     if semestre != "Todos":
-        df = df[df["semestre_atual"] == int(semestre)]
+        resumo = resumo[resumo["Semestre"] == int(semestre)]
 
-    if df.empty:
+    if resumo.empty:
         st.warning("Sem registros disponíveis.")
         return
 
-    resumo = df.groupby("semestre_atual").agg({
-        "id_aluno": "count",
-        "media_notas": "mean",
-        "frequencia": "mean",
-        "taxa_aprovacao": "mean",
-        "Probabilidade": "mean"
-    }).reset_index()
-
-    resumo.columns = ["Semestre", "Total de Alunos", "Média das Notas", "Frequência Média (%)", "Taxa de Aprovação Média", "Probabilidade de Evasão"]
     st.dataframe(resumo.set_index("Semestre"), use_container_width=True)
 
 # ================== TAB 2 — Desempenho Individual ==================
-def exibir_dashboard(df):
+def exibir_dashboard(df, agregados=None):
     st.header("📊 Análise Gráfica de Desempenho")
 
+    # Sem inplace: df é compartilhado com as outras abas (e, pelo cache, com as outras sessões)
     metricas = ["media_notas", "frequencia", "taxa_aprovacao"]
-    for m in metricas:
-        df[m] = pd.to_numeric(df[m], errors="coerce")
-    df.dropna(subset=metricas, inplace=True)
+    df = df.assign(**{m: pd.to_numeric(df[m], errors="coerce") for m in metricas}).dropna(subset=metricas)
 
     if df.empty:
         st.warning("Sem dados numéricos disponíveis para análise.")
@@ -96,7 +115,10 @@ def exibir_dashboard(df):
 
     id_aluno = st.selectbox("👤 Selecione o aluno", sorted(df["id_aluno"].unique()))
     aluno = df[df["id_aluno"] == id_aluno].iloc[0]
-    media_geral = df[metricas].mean()
+    if agregados and agregados.get("media_geral"):
+        media_geral = pd.Series(agregados["media_geral"])
+    else:
+        media_geral = df[metricas].mean()
 
     col1, col2 = st.columns(2)
 
@@ -125,29 +147,35 @@ def exibir_dashboard(df):
     with col2:
         st.markdown("#### 🔎 Frequência x Risco de Evasão")
         if "Probabilidade" in df.columns:
-            fig_disp = px.scatter(df, x="frequencia", y="Probabilidade", color="Probabilidade",
-                                  color_continuous_scale="RdYlBu", title="Relação entre Frequência e Risco")
+            fig_disp = dispersao(df, x="frequencia", y="Probabilidade", color="Probabilidade",
+                                 color_continuous_scale="RdYlBu", title="Relação entre Frequência e Risco")
             st.plotly_chart(fig_disp, use_container_width=True)
         else:
             st.info("Coluna 'Probabilidade' não encontrada.")
 
 # ================== TAB 3 — Alunos em Risco ==================
-def identificar_alunos_em_risco(df):
+def identificar_alunos_em_risco(df, agregados=None, versao=None):
     st.header("🚨 Análise por Nível de Risco de Evasão")
 
     if "Nível de Risco" not in df.columns or "Probabilidade" not in df.columns:
         st.warning("A base precisa conter as colunas 'Nível de Risco' e 'Probabilidade'.")
         return
 
+    distribuicao = (agregados or calcular_agregados(df))["distribuicao_risco"]
+
     niveis_padrao = ["🟢 Baixo", "🟠 Médio", "🔴 Alto"]
-    niveis = [n for n in niveis_padrao if n in df["Nível de Risco"].unique()]
+    niveis = [n for n in niveis_padrao if n in distribuicao]
 
     if not niveis:
         st.info("Nenhum aluno categorizado por nível de risco.")
         return
 
     nivel_escolhido = st.radio("🎯 Selecione o nível de risco:", niveis, horizontal=True)
-    filtrado = df[df["Nível de Risco"] == nivel_escolhido].copy()
+    if versao is not None:
+        # Posições do nível no índice da versão da base (montado uma vez, compartilhado entre sessões)
+        filtrado = obter_indice_risco(("base_oficial", versao), df).filtrar(df, nivel=nivel_escolhido)
+    else:
+        filtrado = df[df["Nível de Risco"] == nivel_escolhido]
 
     if filtrado.empty:
         st.info("Nenhum aluno nesse nível de risco.")
@@ -157,8 +185,7 @@ def identificar_alunos_em_risco(df):
 
     # Gráfico de pizza com proporção de alunos por risco
     st.markdown("### 📊 Distribuição Geral por Nível de Risco")
-    dist_risco = df["Nível de Risco"].value_counts().reset_index()
-    dist_risco.columns = ["Nível de Risco", "Total de Alunos"]
+    dist_risco = pd.DataFrame(list(distribuicao.items()), columns=["Nível de Risco", "Total de Alunos"])
     fig_pie = px.pie(dist_risco, names="Nível de Risco", values="Total de Alunos",
                     color="Nível de Risco",
                     color_discrete_map={"🟢 Baixo": "green", "🟠 Médio": "orange", "🔴 Alto": "red"},
@@ -167,7 +194,7 @@ def identificar_alunos_em_risco(df):
 
     st.markdown("### 🔍 Dispersão: Média das Notas x Probabilidade de Evasão")
     if "media_notas" in df.columns and "Probabilidade" in df.columns:
-        fig_disp = px.scatter(
+        fig_disp = dispersao(
             df,
             x="media_notas",
             y="Probabilidade",
@@ -180,7 +207,7 @@ def identificar_alunos_em_risco(df):
         
     st.markdown("### 📈 Dispersão: Frequência x Probabilidade no grupo selecionado")
     if "frequencia" in filtrado.columns and "Probabilidade" in filtrado.columns:
-        fig_disp = px.scatter(
+        fig_disp = dispersao(
             filtrado,
             x="frequencia",
             y="Probabilidade",
@@ -196,8 +223,9 @@ def identificar_alunos_em_risco(df):
         st.info("Colunas 'frequencia' e/ou 'Probabilidade' ausentes.")
 
 
-    filtrado.loc[:, "Probabilidade (%)"] = (filtrado["Probabilidade"] * 100).round(1)
-    filtrado.loc[:, "Situação Sugerida"] = filtrado["Nível de Risco"].map({
+    # Atribuição da coluna inteira (não .loc): "Situação Sugerida" pode já existir como categoria com outros valores
+    filtrado["Probabilidade (%)"] = (filtrado["Probabilidade"] * 100).round(1)
+    filtrado["Situação Sugerida"] = filtrado["Nível de Risco"].map({
         "🔴 Alto": "Encaminhar para tutoria urgente",
         "🟠 Médio": "Acompanhar de perto com professor tutor",
         "🟢 Baixo": "Manter acompanhamento regular"
@@ -209,5 +237,28 @@ def identificar_alunos_em_risco(df):
     csv = tabela.to_csv(index=False).encode("utf-8")
     st.download_button("⬇️ Baixar análise com recomendações (CSV)", data=csv, file_name="alunos_risco_com_recomendacoes.csv", mime="text/csv")
 
-    pdf = gerar_pdf_risco_alunos(filtrado, titulo="Relatório de Risco com Recomendações")
+    # PDF gerado só quando pedido, em segundo plano, e reaproveitado por (versão da base, nível de risco)
+    versao_base = agregados.get("versao_base") if agregados else None
+    chave_pdf = ("risco_alunos", versao_base if versao_base is not None else id(df), nivel_escolhido)
+    exibir_download_pdf(chave_pdf, filtrado)
+
+@st.fragment
+def exibir_download_pdf(chave_pdf, filtrado):
+    # Dentro de um fragmento: o clique só reexecuta este trecho, e a espera pelo worker não bloqueia o resto da página
+    futuro = consultar_relatorio(chave_pdf)
+
+    if futuro is None or (futuro.done() and futuro.exception() is not None):
+        if futuro is not None:
+            st.error(f"Erro ao gerar o PDF: {futuro.exception()}")
+        if not st.button("📄 Gerar PDF com Recomendações"):
+            return
+        futuro = solicitar_relatorio(chave_pdf, gerar_pdf_risco_alunos, filtrado, titulo="Relatório de Risco com Recomendações")
+
+    with st.spinner("⏳ Gerando PDF com recomendações..."):
+        try:
+            pdf = futuro.result()
+        except Exception as e:
+            st.error(f"Erro ao gerar o PDF: {e}")
+            return
+
     st.download_button("📄 Baixar PDF com Recomendações", data=pdf, file_name="relatorio_alunos_em_risco.pdf", mime="application/pdf")